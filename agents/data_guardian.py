@@ -1,6 +1,29 @@
 # agents/data_guardian.py
 
-from config import genai
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from config import (
+    GUARDIAN_MAX_WORKERS,
+    GUARDIAN_PARALLEL_MIN_CELLS,
+    GUARDIAN_PARALLEL_MIN_COLUMNS,
+    logger,
+)
+from tools.data_layer import save_data_quality_run
+from tools.data_tools import load_source_frame, source_exists
+from tools.llm_client import generate_text
+from tools.profiler import merge_column_batches, profile_dataframe
+from tools.quality_rules import check_columns
+
+# Issues quoted verbatim in the LLM prompt; the rest are summarized by count
+PROMPT_MAX_ISSUES = 30
+
+_pool = None
+_pool_lock = threading.Lock()
 
 
 def sample_dataset():
@@ -12,37 +35,190 @@ def sample_dataset():
     ]
 
 
-def check_basic_quality(data):
-    """Very simple quality metrics over the sample dataset."""
-    total = len(data) or 1
-    null_sla = sum(1 for row in data if row.get("sla_hours") is None)
+def load_dataset(ref):
+    """
+    Resolve a dataset reference to (name, DataFrame).
+
+    Accepts a DataFrame, a list of row dicts, a CSV/XLSX path, or a
+    unified_data source_id (any string that is not an existing file).
+    Raises ValueError for a string that is neither.
+    """
+    if isinstance(ref, pd.DataFrame):
+        return "dataframe", ref
+    if isinstance(ref, list):
+        return "rows", pd.DataFrame(ref)
+    if isinstance(ref, str):
+        if os.path.isfile(ref):
+            ext = os.path.splitext(ref)[1].lower()
+            if ext in (".xlsx", ".xls"):
+                return ref, pd.read_excel(ref)
+            return ref, pd.read_csv(ref)
+        if not source_exists(ref):
+            raise ValueError(f"Unknown dataset: {ref!r} is neither a file nor a known source_id")
+        return ref, load_source_frame(ref)
+    raise ValueError(f"Unsupported dataset reference: {type(ref).__name__}")
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=GUARDIAN_MAX_WORKERS)
+    return _pool
+
+
+def _profile_and_check(frame, ranges):
+    """Profile and rule-check one column batch (runs in a worker process)."""
+    return profile_dataframe(frame), check_columns(frame, ranges)
+
+
+def profile_and_check(df, ranges=None):
+    """
+    Profile the dataset and apply the rule set to every column.
+
+    Large, wide tables are split into one column batch per worker, profiled
+    and checked in a process pool, and the batch profiles merged. Anything
+    smaller runs inline, where pickling the batches would cost more than
+    the work itself. Returns (DatasetProfile, column check results).
+    """
+    columns = list(df.columns)
+    if (
+        GUARDIAN_MAX_WORKERS < 2
+        or len(columns) < GUARDIAN_PARALLEL_MIN_COLUMNS
+        or len(df) * len(columns) < GUARDIAN_PARALLEL_MIN_CELLS
+    ):
+        return profile_dataframe(df), check_columns(df, ranges)
+
+    batch_size = -(-len(columns) // GUARDIAN_MAX_WORKERS)
+    batches = [columns[i : i + batch_size] for i in range(0, len(columns), batch_size)]
+    futures = [_get_pool().submit(_profile_and_check, df[batch], ranges) for batch in batches]
+    profiles, results = [], []
+    for future in futures:
+        profile, checks = future.result()
+        profiles.append(profile)
+        results.extend(checks)
+    return merge_column_batches(profiles), results
 
-    quality_score = 1.0 - null_sla / total
 
+def quality_issues(summary):
+    """Turn a profiler summary into the agent's issue list."""
+    total = summary["row_count"]
     issues = []
-    if null_sla:
+    for column, profile in summary["column_profiles"].items():
+        if profile["null_count"]:
+            issues.append(
+                {
+                    "type": "MissingValues",
+                    "detail": f"{profile['null_count']} rows have null {column} out of {total}.",
+                }
+            )
+        if profile["nonconforming_count"]:
+            issues.append(
+                {
+                    "type": "TypeMismatch",
+                    "detail": f"{profile['nonconforming_count']} {column} values are not {profile['type']}.",
+                }
+            )
+    if summary["duplicate_rows"]:
         issues.append(
             {
-                "type": "MissingValues",
-                "detail": f"{null_sla} rows have null sla_hours out of {total}.",
+                "type": "DuplicateRows",
+                "detail": f"{summary['duplicate_rows']} duplicate rows out of {total}.",
             }
         )
+    return issues
 
-    return {"quality_score": quality_score, "issues": issues}
+
+def check_basic_quality(data, ranges=None):
+    """Profile the dataset (list of row dicts or DataFrame) and apply the column rules."""
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+    timings = {}
+
+    started = time.perf_counter()
+    profile, column_checks = profile_and_check(df, ranges)
+    summary = profile.summary()
+    timings["profile_checks_s"] = round(time.perf_counter() - started, 4)
+
+    issues = quality_issues(summary)
+    rule_violations = 0
+    for check in column_checks:
+        for issue in check["issues"]:
+            # Missing values are already reported by the profiler
+            if issue["type"] != "MissingValues":
+                issues.append({"type": issue["type"], "detail": issue["detail"]})
+                rule_violations += issue["count"]
+
+    issue_count = summary["issue_count"] + rule_violations
+    cells = max(1, summary["row_count"] * summary["column_count"])
+    return {
+        "quality_score": max(0.0, 1.0 - issue_count / cells),
+        "issues": issues,
+        "issue_count": issue_count,
+        "row_count": summary["row_count"],
+        "column_count": summary["column_count"],
+        "pii_columns": {c["column"]: c["pii"] for c in column_checks if c["pii"]},
+        "timings": timings,
+    }
 
 
 def data_guardian_agent(payload=None):
-    """Data Guardian Agent - checks data quality and policy compliance."""
-    data = sample_dataset()
-    basic_checks = check_basic_quality(data)
+    """
+    Data Guardian Agent - checks data quality and policy compliance.
+
+    payload may be a dataset reference (see load_dataset) or a dict with
+    "dataset" (or "path" / "source_id"), optional "ranges" overrides
+    (merged into quality_rules.DEFAULT_RANGES),
+    "uploaded_by" and "persist". Without a dataset the demo sample is used.
+    Runs on real datasets are saved via save_data_quality_run; an empty
+    dataset returns a result with "error" set and is not saved. If the LLM
+    call fails, the rule-based result is returned and saved with
+    raw_llm_text None.
+    """
+    payload = payload if isinstance(payload, dict) else {"dataset": payload}
+    ref = payload.get("dataset")
+    if ref is None:
+        ref = payload.get("path") or payload.get("source_id")
+
+    started = time.perf_counter()
+    if ref is None:
+        dataset_name, df = "sample_dataset", pd.DataFrame(sample_dataset())
+        persist = payload.get("persist", False)
+    else:
+        dataset_name, df = load_dataset(ref)
+        persist = payload.get("persist", True)
+    load_s = time.perf_counter() - started
+
+    if df.empty:
+        # Nothing to score: an empty dataset must not be recorded as a clean run
+        return {
+            "dataset": dataset_name,
+            "error": "Dataset has no rows",
+            "quality_score": None,
+            "issues": [],
+            "pii_columns": {},
+            "row_count": 0,
+            "timings": {"load_s": round(load_s, 4)},
+        }
+
+    basic_checks = check_basic_quality(df, payload.get("ranges"))
+    basic_checks["timings"]["load_s"] = round(load_s, 4)
 
-    model = genai.GenerativeModel("gemini-2.5-flash-lite")
+    prompt_profile = {
+        "dataset": dataset_name,
+        "quality_score": basic_checks["quality_score"],
+        "row_count": basic_checks["row_count"],
+        "column_count": basic_checks["column_count"],
+        "issues": basic_checks["issues"][:PROMPT_MAX_ISSUES],
+        "more_issues": max(0, len(basic_checks["issues"]) - PROMPT_MAX_ISSUES),
+        "pii_columns": basic_checks["pii_columns"],
+    }
 
     prompt = f"""
     You are a data quality and compliance assistant.
 
     Dataset profile:
-    {basic_checks}
+    {prompt_profile}
 
     Tasks:
     1. Rate overall data quality from 0 to 1.
@@ -58,10 +234,36 @@ def data_guardian_agent(payload=None):
     }}
     """
 
-    response = model.generate_content(prompt)
+    started = time.perf_counter()
+    try:
+        llm_text = generate_text(prompt, agent="data_guardian")
+    except Exception:
+        # The rule-based checks are complete; report and save them without the LLM review
+        logger.exception("Data Guardian LLM call failed")
+        llm_text = None
+    basic_checks["timings"]["llm_s"] = round(time.perf_counter() - started, 4)
 
-    return {
-        "quality_score": basic_checks.get("quality_score", 0.85),
-        "issues": basic_checks.get("issues", []),
-        "raw_llm_text": getattr(response, "text", None),
+    result = {
+        "dataset": dataset_name,
+        "quality_score": basic_checks["quality_score"],
+        "issues": basic_checks["issues"],
+        "pii_columns": basic_checks["pii_columns"],
+        "row_count": basic_checks["row_count"],
+        "timings": basic_checks["timings"],
+        "raw_llm_text": llm_text,
     }
+
+    if persist:
+        try:
+            save_data_quality_run(
+                dataset_name=dataset_name,
+                uploaded_by=payload.get("uploaded_by", "data_guardian"),
+                row_count=basic_checks["row_count"],
+                issue_count=basic_checks["issue_count"],
+                score=basic_checks["quality_score"],
+                result=result,
+            )
+        except Exception:
+            logger.exception("Failed to save data quality run")
+
+    return result
@@ -1,30 +1,19 @@
 # agents/data_hub_agent.py
 
-from config import genai
+from tools.llm_client import generate_text
+from tools.metrics_store import get_live_metrics
 
 
-def data_hub_agent(query):
+def data_hub_agent(query, days=None):
     """
     Data Hub Agent – unified data access layer.
 
-    For the demo, this returns a stubbed answer and optionally uses Gemini
-    to rephrase or enrich the response.
+    Reads live ticket, SLA and data source metrics from the materialized
+    metrics tables (kept current by triggers, so lookups do not scan history)
+    and uses Gemini to answer the query from them. days limits ticket and SLA
+    metrics to the most recent N days.
     """
-    # Stubbed internal data lookup – replace with real DB queries later
-    internal_answer = {
-        "ticket_stats": {
-            "total_tickets": 1200,
-            "open_tickets": 85,
-            "high_priority": 23,
-        },
-        "sla": {
-            "breach_rate": 0.07,
-            "avg_resolution_hours": 18,
-        },
-    }
-
-    # Use configured Gemini model
-    model = genai.GenerativeModel("gemini-2.5-flash-lite")
+    internal_answer = get_live_metrics(days)
 
     prompt = f"""
     You are a Data Hub agent for an enterprise support system.
@@ -38,9 +27,9 @@ def data_hub_agent(query):
     Provide a concise, manager-friendly answer to the query in 2–3 sentences.
     """
 
-    response = model.generate_content(prompt)
+    answer = generate_text(prompt, agent="data_hub")
 
     return {
         "raw_data": internal_answer,
-        "answer": getattr(response, "text", None),
+        "answer": answer,
     }
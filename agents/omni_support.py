@@ -1,30 +1,87 @@
 # agents/omni_support.py
+import re
+import threading
+
 from tools.support_tools import search_kb, get_customer_profile
-from config import genai  # already configured
+from tools.data_layer import create_ticket_from_result
+from tools.llm_client import generate_text, parse_json_response
+from config import logger
 
+# Keyword rules for the deterministic tier; first matching intent wins.
+INTENT_RULES = [
+    ("refund", ("refund", "money back", "chargeback")),
+    ("billing", ("payment", "billing", "invoice", "charged", "deducted", "card")),
+    ("bug", ("crash", "error", "bug", "broken", "not working")),
+    ("shipping", ("order", "shipping", "delivery", "tracking")),
+]
+HIGH_PRIORITY_TERMS = ("payment", "refund", "crash", "deducted", "urgent", "outage")
+NO_AUTO_RESOLVE_INTENTS = {"billing", "refund"}
+DECISIONS = {"AUTO_RESOLVE", "ESCALATE_HUMAN", "CONTINUE_CONVERSATION"}
+# Values accepted from the LLM; anything else keeps the rule-based value
+INTENTS = {"billing", "faq", "bug", "shipping", "refund", "access", "complex"}
+PRIORITIES = {"high", "medium", "low"}
 
-def omni_support_agent(ticket_data):
-    """Omni-Support Agent - handles customer tickets"""
-    ticket_id = ticket_data["id"]
-    customer_id = ticket_data["customer_id"]
-    message = ticket_data["message"]
-    channel = ticket_data["channel"]
 
-    # Use configured Gemini model
-    model = genai.GenerativeModel("gemini-2.5-flash-lite")
+def _terms_pattern(terms):
+    """Match any of terms as whole words, allowing plain inflections ("cards", but not "discard")."""
+    alternatives = "|".join(re.escape(term) for term in terms)
+    return re.compile(r"\b(?:" + alternatives + r")(?:s|es|ed|ing)?\b")
 
-    # Get customer context
-    profile = get_customer_profile(customer_id)
 
-    # Search knowledge base
-    kb_result = search_kb(message)
+_INTENT_PATTERNS = [(intent, _terms_pattern(terms)) for intent, terms in INTENT_RULES]
+_HIGH_PRIORITY_PATTERN = _terms_pattern(HIGH_PRIORITY_TERMS)
+
+_tier_counts = {"rules": 0, "llm": 0, "llm_fallback": 0}
+_tier_lock = threading.Lock()
+
+
+def classify_intent(message, kb_confidence):
+    text = message.lower()
+    for intent, pattern in _INTENT_PATTERNS:
+        if pattern.search(text):
+            return intent
+    return "faq" if kb_confidence > 0.7 else "complex"
+
+
+def classify_priority(message, requested=None):
+    if str(requested or "").lower() == "high":
+        return "high"
+    return "high" if _HIGH_PRIORITY_PATTERN.search(message.lower()) else "medium"
+
+
+def rule_decision(intent, priority, confidence):
+    """Apply the support rules; returns a decision or None when the ticket is ambiguous."""
+    if confidence > 0.8 and intent not in NO_AUTO_RESOLVE_INTENTS and priority != "high":
+        return "AUTO_RESOLVE"
+    if priority == "high" or confidence < 0.5:
+        return "ESCALATE_HUMAN"
+    return None
+
+
+def _count_tier(tier):
+    with _tier_lock:
+        _tier_counts[tier] += 1
 
+
+def decision_tier_stats():
+    """Share of tickets settled by rules vs. the LLM (and LLM fallbacks)."""
+    with _tier_lock:
+        counts = dict(_tier_counts)
+    total = sum(counts.values())
+    return {
+        "total": total,
+        "counts": counts,
+        "fractions": {t: round(n / total, 3) if total else 0.0 for t, n in counts.items()},
+    }
+
+
+def _llm_decision(ticket_data, profile, kb_result):
     prompt = f"""
     You are Omni-Support Agent. Process this customer ticket:
 
     Ticket: {ticket_data}
     Customer Profile: {profile}
-    Channel: {channel}
+    Channel: {ticket_data["channel"]}
     KB Match (confidence {kb_result['confidence']:.2f}): {kb_result['answer']}
 
     Tasks:
@@ -47,31 +104,82 @@ def omni_support_agent(ticket_data):
         "escalation_reason": "if applicable"
     }}
     """
+    try:
+        parsed = parse_json_response(generate_text(prompt, agent="omni_support"))
+    except Exception:
+        logger.exception("Omni-Support LLM call failed")
+        parsed = None
+
+    if not parsed or parsed.get("decision") not in DECISIONS:
+        return None
+    return parsed
+
+
+def omni_support_agent(ticket_data, persist=True):
+    """Omni-Support Agent - handles customer tickets (persist=False skips saving escalations)"""
+    ticket_id = ticket_data["id"]
+    customer_id = ticket_data["customer_id"]
+    message = ticket_data["message"]
+    channel = ticket_data["channel"]
+
+    # Get customer context
+    profile = get_customer_profile(customer_id)
+
+    # Search knowledge base
+    kb_result = search_kb(message)
+    confidence = kb_result["confidence"]
 
-    response = model.generate_content(prompt)
+    # Tier 1: deterministic rules settle clear-cut tickets without a model call
+    intent = classify_intent(message, confidence)
+    priority = classify_priority(message, ticket_data.get("priority"))
+    decision = rule_decision(intent, priority, confidence)
+    response = kb_result["answer"]
+    escalation_reason = "Low confidence or high-priority issue"
+    tier = "rules"
 
-    # Simple decision logic based on KB confidence
-    decision = "AUTO_RESOLVE" if kb_result["confidence"] > 0.8 else "ESCALATE_HUMAN"
-    priority_map = {"payment": "high", "refund": "high", "crash": "high"}.get(
-        message.lower(), "medium"
-    )
+    # Tier 2: only ambiguous tickets go to Gemini, and its answer is used
+    if decision is None:
+        llm = _llm_decision(ticket_data, profile, kb_result)
+        if llm is not None:
+            tier = "llm"
+            decision = llm["decision"]
+            if llm.get("intent") in INTENTS:
+                intent = llm["intent"]
+            if llm.get("priority") in PRIORITIES:
+                priority = llm["priority"]
+            response = llm.get("response") or response
+            escalation_reason = llm.get("escalation_reason") or escalation_reason
+            try:
+                confidence = float(llm.get("confidence", confidence))
+            except (TypeError, ValueError):
+                pass
+        else:
+            tier = "llm_fallback"
+            decision = "ESCALATE_HUMAN"
+            escalation_reason = "Ambiguous ticket and no usable LLM decision"
+    _count_tier(tier)
 
     result = {
         "ticket_id": ticket_id,
-        "intent": "faq" if kb_result["confidence"] > 0.7 else "complex",
-        "priority": priority_map,
+        "customer_id": customer_id,
+        "channel": channel,
+        "message": message,
+        "intent": intent,
+        "priority": priority,
         "decision": decision,
-        "confidence": kb_result["confidence"],
-        "response": kb_result["answer"],
+        "decision_tier": tier,
+        "confidence": confidence,
+        "response": response,
         "customer_segment": profile.get("segment", "unknown"),
         "auto_resolve_rate_target": 0.68,
     }
 
     if decision == "ESCALATE_HUMAN":
-        result["escalation_reason"] = "Low confidence or high-priority issue"
-        try:
-            create_ticket_from_result(result)
-        except Exception as e:
-            logger.exception("Failed to save ticket to DB")
+        result["escalation_reason"] = escalation_reason
+        if persist:
+            try:
+                create_ticket_from_result(result)
+            except Exception:
+                logger.exception("Failed to save ticket to DB")
 
     return result
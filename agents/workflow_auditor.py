@@ -1,6 +1,6 @@
 # agents/workflow_auditor.py
 
-from config import genai
+from tools.llm_client import generate_text
 from tools.workflow_tools import analyze_logs, suggest_automation
 
 USE_LIVE_GEMINI = False  # set True later if you want Gemini to summarize
@@ -9,8 +9,8 @@ USE_LIVE_GEMINI = False  # set True later if you want Gemini to summarize
 def workflow_auditor_agent():
     """Workflow Auditor Agent - analyzes workflows and suggests improvements."""
 
-    # 1) Get a summary of recent workflow/event logs
-    log_summary = analyze_logs()  # this can return any dict/summary structure
+    # 1) Stream the agent event logs and workflow stats into a summary
+    log_summary = analyze_logs()
 
     # 2) Get heuristic automation suggestions from our own logic
     suggestions = suggest_automation(log_summary)
@@ -24,11 +24,10 @@ def workflow_auditor_agent():
             ),
             "bottlenecks": suggestions.get("bottlenecks", []),
             "automations": suggestions.get("automations", []),
+            "metrics": log_summary,
         }
 
     # 3) Optional: enrich with Gemini
-    model = genai.GenerativeModel("gemini-2.5-flash-lite")
-
     prompt = f"""
     You are a workflow auditor for an enterprise support organization.
 
@@ -51,7 +50,7 @@ def workflow_auditor_agent():
     }}
     """
 
-    response = model.generate_content(prompt)
+    llm_text = generate_text(prompt, agent="workflow_auditor")
 
     # For now, just return the heuristic suggestions plus raw LLM text
     return {
@@ -61,5 +60,6 @@ def workflow_auditor_agent():
         ),
         "bottlenecks": suggestions.get("bottlenecks", []),
         "automations": suggestions.get("automations", []),
-        "raw_llm_text": getattr(response, "text", None),
+        "metrics": log_summary,
+        "raw_llm_text": llm_text,
     }
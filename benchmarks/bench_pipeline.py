@@ -0,0 +1,411 @@
+"""
+End-to-end benchmark of the ticket, audit and data-quality pipelines.
+
+Generates synthetic customer profiles, ticket history, workflow stats, agent
+event logs and datasets in a scratch directory, then drives process_ticket,
+process_tickets_batch, run_weekly_audit, check_data, ingest_csv and the
+data_layer read helpers against them with the offline LLM backend. Reports
+throughput, p50/p95/p99 latency and process peak RSS after each stage as
+JSON, and compares the report to a stored baseline recorded at the same
+scale (exit status 1 on a regression).
+
+    python -m benchmarks.bench_pipeline --tickets 5000 --log-events 1000000
+    python -m benchmarks.bench_pipeline --save-baseline
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipeline_baseline.json")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Synthetic ticket messages: the first few settle in the rules tier, the
+# vague ones go to the (offline) LLM tier
+TICKET_MESSAGES = [
+    ("My payment failed {n} times", "billing"),
+    ("I was charged twice for invoice {n}", "billing"),
+    ("How do I reset my password?", "faq"),
+    ("Where is my order #{n}? Tracking shows nothing", "shipping"),
+    ("The app crashes when I open report {n}", "bug"),
+    ("I want a refund for order {n}", "refund"),
+    ("Something odd happened with my account {n}", "complex"),
+    ("Can someone call me back about case {n}", "complex"),
+]
+CHANNELS = ("email", "chat", "phone", "web")
+SEGMENTS = ("premium", "standard", "enterprise")
+PRIORITIES = ("high", "medium", "low")
+CITIES = ("Delhi", "Mumbai", "Pune", "Chennai", "Kolkata")
+WORKFLOW_STEPS = ("login_validation", "payment_processing", "ticket_routing", "kyc_check", "refund_approval")
+
+# Stage metrics compared against the baseline: (path, higher_is_better)
+BASELINE_METRICS = (
+    (("throughput_per_s",), True),
+    (("latency_ms", "p95"), False),
+    (("peak_rss_mb",), False),
+)
+# Timer noise floors: throughput of stages shorter than this is not compared,
+# and a latency change smaller than this many ms never counts as a regression
+MIN_COMPARED_SECONDS = 0.1
+MIN_LATENCY_DELTA_MS = 1.0
+
+
+def _peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _percentiles(timings):
+    if not timings:
+        return None
+    timings = sorted(timings)
+
+    def at(q):
+        return round(timings[min(len(timings) - 1, int(len(timings) * q))], 3)
+
+    return {"p50": at(0.5), "p95": at(0.95), "p99": at(0.99), "max": round(timings[-1], 3)}
+
+
+def _stage(timings, seconds, ops=None, **extra):
+    ops = len(timings) if ops is None else ops
+    stage = {
+        "ops": ops,
+        "seconds": round(seconds, 3),
+        "throughput_per_s": round(ops / seconds, 2) if seconds > 0 else None,
+        "latency_ms": _percentiles(timings),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    stage.update(extra)
+    return stage
+
+
+def _timed(fn, calls):
+    """Call fn(*args) for each args tuple; return (per-call ms, wall seconds)."""
+    timings = []
+    started = time.perf_counter()
+    for args in calls:
+        t0 = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings, time.perf_counter() - started
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def make_tickets(n, n_customers, rng, prefix="B"):
+    tickets = []
+    for i in range(n):
+        template, _ = rng.choice(TICKET_MESSAGES)
+        tickets.append(
+            {
+                "id": f"{prefix}{i}",
+                "customer_id": str(1000 + rng.randrange(n_customers)),
+                "channel": rng.choice(CHANNELS),
+                "message": template.format(n=rng.randrange(100_000)),
+            }
+        )
+    return tickets
+
+
+def generate_data(workdir, args, rng):
+    """Write the synthetic data/ tree the agents read and return the dataset paths."""
+    data_dir = os.path.join(workdir, "data")
+    os.makedirs(data_dir)
+    shutil.copy(os.path.join(REPO_ROOT, "data", "kb_articles.csv"), data_dir)
+
+    _write_csv(
+        os.path.join(data_dir, "customer_profiles.csv"),
+        ["customer_id", "segment", "past_tickets", "preferences", "lifetime_value"],
+        (
+            (1000 + i, rng.choice(SEGMENTS), rng.randrange(50), "email", rng.randrange(100, 20_000))
+            for i in range(args.customers)
+        ),
+    )
+    _write_csv(
+        os.path.join(data_dir, "tickets.csv"),
+        ["id", "customer_id", "channel", "message", "intent", "priority", "response_time",
+         "resolution", "sentiment_score"],
+        (
+            (
+                ticket["id"],
+                ticket["customer_id"],
+                ticket["channel"],
+                ticket["message"],
+                rng.choice(TICKET_MESSAGES)[1],
+                rng.choice(PRIORITIES),
+                rng.randrange(10, 600),
+                rng.choice(("pending", "auto_resolved", "escalated")),
+                round(rng.uniform(-1, 1), 2),
+            )
+            for ticket in make_tickets(args.history, args.customers, rng, prefix="H")
+        ),
+    )
+    _write_csv(
+        os.path.join(data_dir, "workflows.csv"),
+        ["process_id", "step_name", "avg_duration", "failure_rate", "volume", "suggested_fix"],
+        (
+            (
+                f"WF{i:04d}",
+                f"{rng.choice(WORKFLOW_STEPS)}_{i}",
+                round(rng.lognormvariate(1, 0.8), 2),
+                round(rng.uniform(0, 0.5), 2),
+                rng.randrange(10, 5000),
+                rng.choice(("Add caching layer", "Retry mechanism needed", "None")),
+            )
+            for i in range(args.workflow_steps)
+        ),
+    )
+
+    # Historical agent events in the orchestrator's log record format
+    with open(os.environ["EVENT_LOG_PATH"], "w", encoding="utf-8") as f:
+        for i in range(args.log_events):
+            _, intent = rng.choice(TICKET_MESSAGES)
+            record = {
+                "timestamp": "2025-01-01T00:00:00",
+                "ticket_id": f"L{i}",
+                "event": "processed",
+                "step": rng.choice(("omni_support",) + WORKFLOW_STEPS),
+                "duration_ms": round(rng.lognormvariate(5, 1), 3),
+                "data": {
+                    "intent": intent,
+                    "decision": rng.choice(("AUTO_RESOLVE", "ESCALATE_HUMAN", "CONTINUE_CONVERSATION")),
+                    "decision_tier": rng.choice(("rules", "rules", "llm")),
+                },
+            }
+            f.write(json.dumps(record) + "\n")
+
+    datasets = {}
+    for storage in ("json", "columnar"):
+        path = os.path.join(data_dir, f"dataset_{storage}.csv")
+        _write_csv(
+            path,
+            ["record_id", "customer_id", "age", "city", "email", "last_purchase_amount"],
+            (
+                (
+                    i,
+                    1000 + rng.randrange(args.customers),
+                    rng.randrange(18, 90) if rng.random() > 0.05 else "",
+                    rng.choice(CITIES),
+                    f"user{i}@example.com" if rng.random() > 0.03 else "not-an-email",
+                    round(rng.uniform(-50, 5000), 2),
+                )
+                for i in range(args.dataset_rows)
+            ),
+        )
+        datasets[storage] = path
+    return datasets
+
+
+def compare(report, baseline, tolerance):
+    """Per-stage change against a baseline report; a stage regresses beyond tolerance."""
+    if baseline.get("scale") != report["scale"]:
+        return {"comparable": False, "reason": "baseline was recorded at a different scale", "passed": True}
+    stages = {}
+    for name, stage in report["stages"].items():
+        base_stage = baseline.get("stages", {}).get(name)
+        if base_stage is None:
+            continue
+        metrics = {}
+        for path, higher_is_better in BASELINE_METRICS:
+            current, base = stage, base_stage
+            for key in path:
+                current = (current or {}).get(key)
+                base = (base or {}).get(key)
+            if not current or not base:
+                continue
+            if path == ("throughput_per_s",) and base_stage["seconds"] < MIN_COMPARED_SECONDS:
+                continue
+            change = (current - base) / base
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            if path[0] == "latency_ms" and current - base < MIN_LATENCY_DELTA_MS:
+                regressed = False
+            metrics[".".join(path)] = {
+                "baseline": base,
+                "current": current,
+                "change": round(change, 4),
+                "regressed": regressed,
+            }
+        stages[name] = {
+            "metrics": metrics,
+            "regressed": any(m["regressed"] for m in metrics.values()),
+        }
+    return {
+        "comparable": True,
+        "tolerance": tolerance,
+        "stages": stages,
+        "passed": not any(s["regressed"] for s in stages.values()),
+    }
+
+
+def run(args, datasets, rng):
+    # Imported only after DB_PATH / LLM_BACKEND are set and the data/ tree exists
+    from orchestrator import EnterpriseFusionOrchestrator
+    from agents.omni_support import decision_tier_stats
+    from tools.data_layer import init_db, list_data_quality_runs, list_tickets_for_customer
+    from tools.data_tools import ingest_csv
+    from tools.llm_client import llm_stats
+    from tools.metrics_store import get_live_metrics
+
+    init_db()
+    orchestrator = EnterpriseFusionOrchestrator()
+    stages = {}
+
+    tickets = make_tickets(args.tickets, args.customers, rng, prefix="S")
+    timings, seconds = _timed(orchestrator.process_ticket, ((t,) for t in tickets))
+    stages["process_ticket"] = _stage(timings, seconds)
+
+    batch_timings = []
+    process_one = orchestrator.process_ticket
+
+    def timed_process(ticket_data):
+        t0 = time.perf_counter()
+        try:
+            return process_one(ticket_data)
+        finally:
+            batch_timings.append((time.perf_counter() - t0) * 1000)
+
+    orchestrator.process_ticket = timed_process
+    batch = make_tickets(args.tickets, args.customers, rng, prefix="P")
+    started = time.perf_counter()
+    report = orchestrator.process_tickets_batch(batch, max_workers=args.workers)
+    stages["process_tickets_batch"] = _stage(
+        batch_timings,
+        time.perf_counter() - started,
+        workers=args.workers,
+        failed=report["stats"]["failed"],
+    )
+    orchestrator.process_ticket = process_one
+    orchestrator.flush_events()
+
+    for storage, path in datasets.items():
+        started = time.perf_counter()
+        ingest_csv(path, storage=storage)
+        seconds = time.perf_counter() - started
+        stages[f"ingest_csv_{storage}"] = _stage(
+            [seconds * 1000], seconds, ops=args.dataset_rows, unit="rows"
+        )
+
+    # First call (lazy imports, cold caches) is reported apart from the repeats
+    payload = {"dataset": datasets["json"], "uploaded_by": "benchmark"}
+    (cold_ms,), _ = _timed(orchestrator.check_data, [(payload,)])
+    timings, seconds = _timed(orchestrator.check_data, [(payload,)] * args.repeats)
+    stages["check_data"] = _stage(
+        timings, seconds, cold_ms=round(cold_ms, 3), rows=args.dataset_rows
+    )
+
+    (cold_ms,), _ = _timed(orchestrator.run_weekly_audit, [()])
+    timings, seconds = _timed(orchestrator.run_weekly_audit, [()] * args.repeats)
+    stages["run_weekly_audit"] = _stage(
+        timings, seconds, cold_ms=round(cold_ms, 3), log_events=args.log_events + 2 * args.tickets
+    )
+
+    lookups = [(str(1000 + rng.randrange(args.customers)),) for _ in range(args.lookups)]
+    timings, seconds = _timed(list_tickets_for_customer, lookups)
+    stages["list_tickets_for_customer"] = _stage(timings, seconds)
+    timings, seconds = _timed(list_data_quality_runs, [()] * args.lookups)
+    stages["list_data_quality_runs"] = _stage(timings, seconds)
+    timings, seconds = _timed(get_live_metrics, [()] * args.lookups)
+    stages["get_live_metrics"] = _stage(timings, seconds)
+
+    orchestrator.close()
+    return stages, {"llm": llm_stats(), "decision_tiers": decision_tier_stats()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickets", type=int, default=500, help="tickets per processing stage")
+    parser.add_argument("--customers", type=int, default=5_000)
+    parser.add_argument("--history", type=int, default=20_000, help="rows in data/tickets.csv")
+    parser.add_argument("--workflow-steps", type=int, default=500)
+    parser.add_argument("--log-events", type=int, default=100_000)
+    parser.add_argument("--dataset-rows", type=int, default=50_000)
+    parser.add_argument(
+        "--repeats", type=int, default=5, help="warm runs of check_data / run_weekly_audit"
+    )
+    parser.add_argument("--lookups", type=int, default=500, help="calls per data_layer helper")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--llm-latency-ms", type=float, default=50)
+    parser.add_argument("--llm-error-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative change")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the baseline")
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="ef_pipeline_")
+    os.environ.update(
+        {
+            "DB_PATH": os.path.join(workdir, "bench.db"),
+            "EVENT_LOG_PATH": os.path.join(workdir, "agent_logs.jsonl"),
+            "LLM_BACKEND": "offline",
+            "LLM_CACHE_DB": "",
+            "LLM_OFFLINE_LATENCY_MS": str(args.llm_latency_ms),
+            "LLM_OFFLINE_ERROR_RATE": str(args.llm_error_rate),
+            "LLM_OFFLINE_SEED": str(args.seed),
+            "LLM_BACKOFF_S": "0.01",
+        }
+    )
+    # The agents read data/*.csv relative to the working directory
+    sys.path.insert(0, REPO_ROOT)
+    cwd = os.getcwd()
+    rng = random.Random(args.seed)
+    try:
+        started = time.perf_counter()
+        datasets = generate_data(workdir, args, rng)
+        generate_s = time.perf_counter() - started
+        os.chdir(workdir)
+        stages, llm = run(args, datasets, rng)
+    finally:
+        os.chdir(cwd)
+        from tools.db_pool import get_pool
+
+        get_pool().close_all()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    scale = {
+        key: getattr(args, key)
+        for key in (
+            "tickets", "customers", "history", "workflow_steps", "log_events",
+            "dataset_rows", "repeats", "lookups", "workers", "llm_latency_ms",
+            "llm_error_rate", "seed",
+        )
+    }
+    report = {
+        "scale": scale,
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "generate_seconds": round(generate_s, 3),
+        "stages": stages,
+        **llm,
+    }
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    if not report.get("comparison", {}).get("passed", True):
+        sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
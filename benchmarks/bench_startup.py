@@ -0,0 +1,203 @@
+"""
+Import-time and cold-start benchmark with a pass/fail budget.
+
+Runs fresh interpreters that import the orchestrator, apply migrations and
+process one rule-tier ticket, and reports the per-module import breakdown
+(from -X importtime), time from process spawn to the first processed
+ticket, resident memory, and which heavy optional dependencies got loaded.
+Exits with status 1 when a median exceeds its budget or a heavy module is
+imported on the ticket path.
+
+    python -m benchmarks.bench_startup --runs 5 --max-first-ticket-ms 1500
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Modules the ticket path should not pull in at startup
+HEAVY_MODULES = ("pandas", "matplotlib", "sklearn", "google.generativeai")
+# A message the keyword rules settle without calling the LLM
+RULE_TIER_TICKET = {
+    "id": "startup-bench",
+    "customer_id": "1001",
+    "channel": "chat",
+    "message": "How do I reset my password?",
+}
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    import resource
+
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def child():
+    """Cold-start probe, run in a fresh interpreter by main()."""
+    spawned_at = float(os.environ["BENCH_SPAWNED_AT"])
+    t0 = time.perf_counter()
+    from orchestrator import EnterpriseFusionOrchestrator
+
+    import_ms = (time.perf_counter() - t0) * 1000
+    rss_import = _rss_mb()
+
+    from tools.data_layer import init_db
+
+    init_db()
+    result = EnterpriseFusionOrchestrator().process_ticket(dict(RULE_TIER_TICKET))
+    first_ticket_ms = (time.perf_counter() - t0) * 1000
+
+    print(
+        json.dumps(
+            {
+                "import_ms": import_ms,
+                "first_ticket_ms": first_ticket_ms,
+                "spawn_to_first_ticket_ms": (time.time() - spawned_at) * 1000,
+                "rss_after_import_mb": rss_import,
+                "rss_after_first_ticket_mb": _rss_mb(),
+                "decision_tier": result.get("decision_tier"),
+                "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+            }
+        )
+    )
+
+
+def _env(workdir):
+    env = dict(os.environ)
+    env["DB_PATH"] = os.path.join(workdir, "bench.db")
+    env["EVENT_LOG_PATH"] = os.path.join(workdir, "agent_logs.jsonl")
+    env["LLM_CACHE_DB"] = ""
+    env["LLM_MAX_RETRIES"] = "0"
+    return env
+
+
+def import_breakdown(target, env, top=15):
+    """Per-module import cost of `import target` from -X importtime, in ms."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append(
+                {
+                    "module": name,
+                    "depth": len(indent) // 2,
+                    "self_ms": int(self_us) / 1000,
+                    "cumulative_ms": int(cumulative_us) / 1000,
+                }
+            )
+    total = next((m["cumulative_ms"] for m in modules if m["module"] == target), None)
+    by_cumulative = sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)
+    by_self = sorted(modules, key=lambda m: m["self_ms"], reverse=True)
+    return {
+        "target": target,
+        "total_ms": total,
+        "modules_imported": len(modules),
+        "top_cumulative": by_cumulative[:top],
+        "top_self": by_self[:top],
+    }
+
+
+def cold_start(env):
+    env = dict(env, BENCH_SPAWNED_AT=repr(time.time()))
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", default="orchestrator", help="module for the import breakdown")
+    parser.add_argument("--max-import-ms", type=float, default=200)
+    parser.add_argument("--max-first-ticket-ms", type=float, default=400)
+    parser.add_argument("--max-rss-mb", type=float, default=100)
+    parser.add_argument(
+        "--allow-heavy", action="store_true", help="do not fail when HEAVY_MODULES get loaded"
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child()
+        return None
+
+    workdir = tempfile.mkdtemp(prefix="ef_startup_")
+    try:
+        env = _env(workdir)
+        breakdown = import_breakdown(args.target, env)
+        runs = [cold_start(env) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    def median(key):
+        return round(statistics.median(r[key] for r in runs), 1)
+
+    medians = {
+        key: median(key)
+        for key in (
+            "import_ms",
+            "first_ticket_ms",
+            "spawn_to_first_ticket_ms",
+            "rss_after_import_mb",
+            "rss_after_first_ticket_mb",
+        )
+    }
+    checks = {
+        "import_ms": (medians["import_ms"], args.max_import_ms),
+        "spawn_to_first_ticket_ms": (medians["spawn_to_first_ticket_ms"], args.max_first_ticket_ms),
+        "rss_after_first_ticket_mb": (medians["rss_after_first_ticket_mb"], args.max_rss_mb),
+    }
+    budget = {
+        name: {"value": value, "limit": limit, "passed": value <= limit}
+        for name, (value, limit) in checks.items()
+    }
+    heavy = sorted({m for r in runs for m in r["heavy_modules_loaded"]})
+    budget["heavy_modules_loaded"] = {
+        "value": heavy,
+        "limit": [],
+        "passed": args.allow_heavy or not heavy,
+    }
+    report = {
+        "runs": args.runs,
+        "median": medians,
+        "decision_tiers": sorted({r["decision_tier"] for r in runs}),
+        "imports": breakdown,
+        "budget": budget,
+        "passed": all(check["passed"] for check in budget.values()),
+    }
+    print(json.dumps(report, indent=2))
+    if not report["passed"]:
+        sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Ticket history lookup benchmark.
+
+Fills a scratch database with synthetic tickets, applies the migrations and
+times list_tickets_for_customer / list_data_quality_runs.
+
+    python -m benchmarks.bench_ticket_history --tickets 2000000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+
+def _fill_tickets(n_tickets, n_customers, batch=100_000):
+    from tools.db_pool import transaction
+
+    rng = random.Random(42)
+    sql = (
+        "INSERT INTO tickets (ticket_id, customer_id, channel, message, intent, "
+        "priority, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    for start in range(0, n_tickets, batch):
+        rows = (
+            (
+                f"T{i}",
+                str(1000 + rng.randrange(n_customers)),
+                "email",
+                "synthetic ticket",
+                "faq",
+                "medium",
+                "open",
+                f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:00",
+            )
+            for i in range(start, min(start + batch, n_tickets))
+        )
+        with transaction() as conn:
+            conn.executemany(sql, rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="ef_bench_")
+    os.environ["DB_PATH"] = os.path.join(workdir, "bench.db")
+
+    # Imported after DB_PATH is set so the pool points at the scratch DB
+    from tools.db_pool import get_connection, get_pool
+    from tools.data_layer import init_db, list_tickets_for_customer, list_data_quality_runs
+
+    init_db()
+    started = time.perf_counter()
+    _fill_tickets(args.tickets, args.customers)
+    fill_s = time.perf_counter() - started
+
+    conn = get_connection()
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM tickets WHERE customer_id = ? "
+        "ORDER BY created_at DESC, id DESC LIMIT 10",
+        ("1001",),
+    ).fetchall()
+
+    rng = random.Random(7)
+    timings = []
+    for _ in range(args.lookups):
+        customer_id = str(1000 + rng.randrange(args.customers))
+        t0 = time.perf_counter()
+        list_tickets_for_customer(customer_id, limit=10)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    list_data_quality_runs(limit=10)
+    runs_ms = (time.perf_counter() - t0) * 1000
+
+    timings.sort()
+    report = {
+        "tickets": args.tickets,
+        "customers": args.customers,
+        "fill_seconds": round(fill_s, 2),
+        "query_plan": [row[-1] for row in plan],
+        "history_ms": {
+            "p50": round(statistics.median(timings), 4),
+            "p99": round(timings[int(len(timings) * 0.99) - 1], 4),
+            "max": round(timings[-1], 4),
+        },
+        "dq_runs_ms": round(runs_ms, 4),
+    }
+    print(json.dumps(report, indent=2))
+
+    get_pool().close_all()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import os
+import threading
 from dotenv import load_dotenv
-import google.generativeai as genai
 import logging
 
 # Load .env
@@ -8,13 +8,103 @@ load_dotenv()
 
 # --- Gemini API key ---
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
-    print("WARNING: GEMINI_API_KEY not set – live Gemini will not work")
+
+_genai = None
+_genai_lock = threading.Lock()
+
+
+def get_genai():
+    """
+    Import and configure google.generativeai on first use.
+
+    The SDK takes a few hundred ms to import, so processes that never call
+    the LLM (workers on cached or rule-based paths, tooling) skip it.
+    """
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+
+                if GEMINI_API_KEY:
+                    genai.configure(api_key=GEMINI_API_KEY)
+                else:
+                    print("WARNING: GEMINI_API_KEY not set – live Gemini will not work")
+                _genai = genai
+    return _genai
+
+# --- LLM client (see tools/llm_client.py and tools/llm_backends.py) ---
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # "gemini" or "offline"
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash-lite")
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_S = float(os.getenv("LLM_BACKOFF_S", "0.5"))
+
+# Offline stand-in backend: median latency, lognormal spread, failure share,
+# tokens per character of prompt/response, and RNG seed
+LLM_OFFLINE_LATENCY_MS = float(os.getenv("LLM_OFFLINE_LATENCY_MS", "300"))
+LLM_OFFLINE_LATENCY_SIGMA = float(os.getenv("LLM_OFFLINE_LATENCY_SIGMA", "0.5"))
+LLM_OFFLINE_ERROR_RATE = float(os.getenv("LLM_OFFLINE_ERROR_RATE", "0"))
+LLM_OFFLINE_TOKENS_PER_CHAR = float(os.getenv("LLM_OFFLINE_TOKENS_PER_CHAR", "0.25"))
+LLM_OFFLINE_SEED = int(os.getenv("LLM_OFFLINE_SEED", "0"))
+
+# --- LLM response cache (see tools/llm_cache.py) ---
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB")  # e.g. "llm_cache.db"; unset = memory only
+# Seconds a cached response stays valid, per agent; 0 disables caching
+LLM_CACHE_TTLS = {
+    "default": 600,
+    "omni_support": 600,
+    "data_guardian": 3600,
+    "data_hub": 300,
+    "workflow_auditor": 3600,
+}
+
+# --- Orchestrator batch processing ---
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "8"))
+
+# --- Data Guardian column checks ---
+GUARDIAN_MAX_WORKERS = int(os.getenv("GUARDIAN_MAX_WORKERS", str(os.cpu_count() or 2)))
+GUARDIAN_PARALLEL_MIN_COLUMNS = int(os.getenv("GUARDIAN_PARALLEL_MIN_COLUMNS", "32"))
+# Below this many cells (rows x columns) pickling batches to worker processes
+# costs more than profiling and checking them inline
+GUARDIAN_PARALLEL_MIN_CELLS = int(os.getenv("GUARDIAN_PARALLEL_MIN_CELLS", "2000000"))
+
+# --- Agent event log (see tools/event_log.py) ---
+EVENT_LOG_PATH = os.getenv("EVENT_LOG_PATH", "agent_logs.jsonl")
+EVENT_LOG_BUFFER = int(os.getenv("EVENT_LOG_BUFFER", "10000"))
+EVENT_LOG_BATCH = int(os.getenv("EVENT_LOG_BATCH", "256"))
+EVENT_LOG_FLUSH_S = float(os.getenv("EVENT_LOG_FLUSH_S", "1.0"))
+EVENT_LOG_MAX_BYTES = int(os.getenv("EVENT_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+EVENT_LOG_BACKUPS = int(os.getenv("EVENT_LOG_BACKUPS", "5"))
+
+# --- Workflow audit ---
+# Duration target in seconds per workflow step; runs above it breach the SLA
+WORKFLOW_SLA_S = {
+    "default": float(os.getenv("WORKFLOW_SLA_S", "30")),
+    "omni_support": 10.0,
+}
 
 # --- Database path for SQLite ---
 DB_PATH = os.getenv("DB_PATH", "enterprise_fusion.db")
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")  # safe with WAL
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "65536"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+
+# --- Evaluation (see evaluation.py) ---
+EVAL_TICKETS_PATH = os.getenv("EVAL_TICKETS_PATH", "data/eval_tickets.csv")
+EVAL_MAX_WORKERS = int(os.getenv("EVAL_MAX_WORKERS", "8"))
+EVAL_CACHE_ENABLED = os.getenv("EVAL_CACHE_ENABLED", "1") == "1"
+# Completed cases written to the result cache per transaction
+EVAL_CACHE_BATCH = int(os.getenv("EVAL_CACHE_BATCH", "100"))
+
+# --- Unified store ---
+INGEST_STORAGE = os.getenv("INGEST_STORAGE", "json")  # "json" rows or "columnar" tables
+QUERY_PAGE_SIZE = int(os.getenv("QUERY_PAGE_SIZE", "1000"))
+QUERY_MAX_ROWS = int(os.getenv("QUERY_MAX_ROWS", "10000"))
+QUERY_TIMEOUT_S = float(os.getenv("QUERY_TIMEOUT_S", "10"))
 
 # --- Logging ---
 logging.basicConfig(
@@ -1,22 +1,72 @@
-import json
 import streamlit as st
 import pandas as pd
 
-from tools.data_layer import (
-    list_tickets_for_customer,
-    list_data_quality_runs,
-    save_data_quality_run,
-)
-
-from agents.omni_support import omni_support_agent
-from agents.workflow_auditor import workflow_auditor_agent
-from agents.data_guardian import data_guardian_agent
-from orchestrator import EnterpriseFusionOrchestrator
-from evaluation import run_full_evaluation
-from tools.analytics_tools import generate_weekly_report
-from tools.data_tools import init_db
 from config import logger
 
+# Agents, the orchestrator, sklearn (evaluation) and matplotlib (charts) are
+# imported inside the view that needs them, so a rerun only pays for the
+# selected view and long-lived objects are built once per server process.
+
+
+# ---------- Cached resources & data ----------
+
+
+@st.cache_resource(show_spinner=False)
+def get_db_pool():
+    """Migrate the schema once per process and hold the shared connection pool."""
+    from tools.data_tools import init_db
+    from tools.db_pool import get_pool
+
+    init_db()
+    return get_pool()
+
+
+@st.cache_resource(show_spinner="Starting agents…")
+def get_orchestrator():
+    get_db_pool()
+    from orchestrator import EnterpriseFusionOrchestrator
+
+    return EnterpriseFusionOrchestrator()
+
+
+@st.cache_resource(show_spinner="Loading knowledge base and customer profiles…")
+def get_support_indexes():
+    """Build the KB index and profile store up front instead of on the first ticket."""
+    from tools.kb_search import get_knowledge_base
+    from tools.profile_store import get_profile_store
+
+    return get_knowledge_base(), get_profile_store()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def cached_weekly_report(tickets_version):
+    """Weekly report, recomputed only when the ticket history or tickets table changes (version is the key)."""
+    from tools.analytics_tools import generate_weekly_report
+
+    return generate_weekly_report()
+
+
+def weekly_report():
+    from tools.analytics_engine import get_ticket_analytics
+
+    get_db_pool()
+    return cached_weekly_report(get_ticket_analytics().version())
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_quality_runs(version, limit):
+    """Recent runs, re-queried only when a new run is saved (version is the key)."""
+    from tools.data_layer import list_data_quality_runs
+
+    return list_data_quality_runs(limit=limit)
+
+
+def recent_quality_runs(limit=5):
+    from tools.data_layer import data_quality_runs_version
+
+    get_db_pool()
+    return cached_quality_runs(data_quality_runs_version(), limit)
+
 
 # ---------- Page config & intro ----------
 
@@ -41,11 +91,8 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# Ensure DB exists (no-op if already created)
-init_db()
-
-# Create orchestrator
-orchestrator = EnterpriseFusionOrchestrator()
+# Ensure DB exists (migrations run once per server process)
+get_db_pool()
 
 
 # ---------- Helper render functions ----------
@@ -54,6 +101,9 @@ orchestrator = EnterpriseFusionOrchestrator()
 def show_ticket_view():
     st.header("💬 Ticket Workspace")
 
+    orchestrator = get_orchestrator()
+    get_support_indexes()
+
     col1, col2 = st.columns(2)
 
     with col1:
@@ -90,6 +140,8 @@ def show_ticket_view():
         cust_id = result.get("customer_id")
         if cust_id:
             st.markdown("### Recent tickets for this customer")
+            from tools.data_layer import list_tickets_for_customer
+
             history = list_tickets_for_customer(cust_id, limit=5)
             if history:
                 df = pd.DataFrame(history)
@@ -107,7 +159,9 @@ def show_audit_view():
 
     if st.button("Run Weekly Audit"):
         with st.spinner("Running Workflow Auditor Agent…"):
-            audit_result = orchestrator.run_weekly_audit()
+            from agents.workflow_auditor import workflow_auditor_agent
+
+            audit_result = workflow_auditor_agent()
 
         st.subheader("Audit Summary")
         st.write(audit_result.get("summary", ""))
@@ -131,7 +185,7 @@ def show_audit_view():
             st.write("No new automations suggested.")
 
         st.subheader("Weekly Report JSON")
-        st.json(generate_weekly_report())
+        st.json(weekly_report())
 
 
 def show_data_view():
@@ -145,59 +199,40 @@ def show_data_view():
 
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
+            preview = pd.read_csv(uploaded_file, nrows=5)
         except Exception as e:
             st.error(f"Could not read CSV: {e}")
             logger.exception("CSV read failed in Data Quality view")
             st.stop()
 
         st.subheader("Preview")
-        st.dataframe(df.head())
+        st.dataframe(preview)
 
-        if df.empty:
+        if preview.empty:
             st.warning("The uploaded CSV is empty. Nothing to analyze.")
             st.stop()
 
-        row_count = len(df)
-        null_counts = df.isna().sum()
-        total_nulls = int(null_counts.sum())
-        issue_count = total_nulls
-
-        score = max(
-            0.0,
-            1.0 - (issue_count / max(1, row_count * len(df.columns))),
-        )
-
-        result = {
-            "columns": list(df.columns),
-            "row_count": row_count,
-            "null_counts": null_counts.to_dict(),
-            "issue_count": issue_count,
-            "score": score,
-        }
-
         dataset_name = uploaded_file.name
         uploaded_by = "demo_user"  # later: real user / email
 
+        from tools.incremental_quality import run_incremental_quality
+
         try:
-            save_data_quality_run(
-                dataset_name=dataset_name,
-                uploaded_by=uploaded_by,
-                row_count=row_count,
-                issue_count=issue_count,
-                score=score,
-                result=result,
+            # Re-profiles only the partitions that changed since the last upload
+            result = run_incremental_quality(
+                uploaded_file, dataset_name=dataset_name, uploaded_by=uploaded_by
             )
             st.success("Data quality run saved to database.")
         except Exception as e:
-            st.error(f"Failed to save data quality run: {e}")
-            logger.exception("save_data_quality_run failed in Data Quality view")
+            st.error(f"Failed to run data quality checks: {e}")
+            logger.exception("run_incremental_quality failed in Data Quality view")
+            st.stop()
 
         st.subheader("Data Quality Summary")
         st.json(result)
 
     st.markdown("### Recent Data Quality Runs")
-    runs = list_data_quality_runs(limit=5)
+    runs = recent_quality_runs(limit=5)
     if runs:
         hist_df = pd.DataFrame(runs)
         st.dataframe(hist_df)
@@ -213,8 +248,33 @@ def show_evaluation_view():
     )
 
     if st.button("Run Evaluation"):
+        from evaluation import run_full_evaluation
+
+        bar = st.progress(0.0, text="Scoring gold tickets…")
+        live = st.empty()
+        recent = []
+
+        def on_case(case, done, total):
+            recent.append(case)
+            # Redraw every 50 cases; cached cases arrive far faster than the UI can render
+            if done % 50 and done != total:
+                return
+            correct = sum(c["correct"] for c in recent)
+            cached = sum(c["cached"] for c in recent)
+            bar.progress(done / total, text=f"{done}/{total} tickets scored ({cached} from cache)")
+            with live.container():
+                st.caption(f"Intent accuracy so far: {correct / done:.1%}")
+                st.dataframe(
+                    pd.DataFrame(recent[-10:])[
+                        ["case_id", "expected_intent", "predicted_intent", "correct", "cached"]
+                    ]
+                )
+
         with st.spinner("Evaluating agents…"):
-            eval_result = run_full_evaluation()
+            eval_result = run_full_evaluation(
+                business_metrics=weekly_report()["metrics"], progress=on_case
+            )
+        live.empty()
 
         st.subheader("Overall Score")
         st.write(eval_result.get("overall_score", "N/A"))
@@ -1,17 +1,46 @@
 # orchestrator.py
-import json
-import pandas as pd
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from config import BATCH_MAX_WORKERS, logger
 
-from agents.data_hub_agent import data_hub_agent  # if you use it
-from agents.workflow_auditor import workflow_auditor_agent
-from agents.data_guardian import data_guardian_agent
 from agents.omni_support import omni_support_agent
-from tools.analytics_tools import generate_weekly_report
+from tools.event_log import get_event_log
+
+# The audit, reporting and data-quality agents (pandas, matplotlib) are
+# imported by the methods that use them, keeping ticket workers' cold start short.
 
 
 class EnterpriseFusionOrchestrator:
     def __init__(self):
         self.sessions = {}
+        self.event_log = get_event_log()
+        # One long-lived worker pool of BATCH_MAX_WORKERS threads, so batch
+        # threads (and their pooled DB connections) are reused across
+        # batches; created on first batch. Per-batch limits bound how many
+        # of a batch's tickets are in flight, never the pool itself, so a
+        # batch can't tear down the pool another batch is running on.
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=BATCH_MAX_WORKERS, thread_name_prefix="ticket-batch"
+                )
+            return self._executor
+
+    def close(self):
+        """Stop the batch worker pool and flush buffered events."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.flush_events()
 
     def process_ticket(self, ticket_data):
         """Main ticket processing pipeline."""
@@ -19,33 +48,123 @@ class EnterpriseFusionOrchestrator:
         self.sessions[ticket_id] = {"state": "new"}
 
         # Route to Omni-Support Agent
+        started = time.perf_counter()
         result = omni_support_agent(ticket_data)
+        duration_ms = (time.perf_counter() - started) * 1000
 
         # Log result
-        self.log_event(ticket_id, "processed", result)
+        self.log_event(ticket_id, "processed", result, step="omni_support", duration_ms=duration_ms)
         return result
 
+    def _safe_process(self, ticket_data):
+        """Process one ticket, turning a failure into an error record."""
+        started = time.perf_counter()
+        try:
+            return self.process_ticket(ticket_data), None
+        except Exception as e:
+            logger.exception("Ticket processing failed")
+            error = {"ticket_id": ticket_data.get("id"), "error": f"{type(e).__name__}: {e}"}
+            self.log_event(
+                ticket_data.get("id"),
+                "failed",
+                error,
+                step="omni_support",
+                duration_ms=(time.perf_counter() - started) * 1000,
+            )
+            return error, error
+
+    @staticmethod
+    def _batch_report(outcomes, started):
+        elapsed = time.perf_counter() - started
+        errors = [error for _, error in outcomes if error is not None]
+        return {
+            "results": [result for result, _ in outcomes],
+            "errors": errors,
+            "stats": {
+                "tickets": len(outcomes),
+                "succeeded": len(outcomes) - len(errors),
+                "failed": len(errors),
+                "seconds": round(elapsed, 3),
+                "tickets_per_sec": round(len(outcomes) / elapsed, 2) if elapsed > 0 else None,
+            },
+        }
+
+    def process_tickets_batch(self, tickets, max_workers=BATCH_MAX_WORKERS):
+        """
+        Process many tickets concurrently on the shared worker pool.
+
+        At most max_workers of this batch's tickets (capped at
+        BATCH_MAX_WORKERS) run at a time. Results come back in input order;
+        a failing ticket yields an {"ticket_id", "error"} entry instead of
+        aborting the batch. The worker pool is kept between batches until
+        close().
+        """
+        started = time.perf_counter()
+        executor = self._get_executor()
+        tickets = list(tickets)
+        outcomes = [None] * len(tickets)
+        pending = {}
+        for index, ticket_data in enumerate(tickets):
+            if len(pending) >= max(1, max_workers):
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outcomes[pending.pop(future)] = future.result()
+            pending[executor.submit(self._safe_process, ticket_data)] = index
+        for future, index in pending.items():
+            outcomes[index] = future.result()
+        return self._batch_report(outcomes, started)
+
+    async def aprocess_ticket(self, ticket_data):
+        """Async variant of process_ticket; runs the pipeline in a worker thread."""
+        return await asyncio.to_thread(self.process_ticket, ticket_data)
+
+    async def aprocess_tickets_batch(self, tickets, max_concurrency=BATCH_MAX_WORKERS):
+        """
+        Async batch processing on the shared worker pool; same report as
+        process_tickets_batch. A semaphore keeps at most max_concurrency of
+        this batch's tickets in flight.
+        """
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+
+        async def run(ticket_data):
+            async with semaphore:
+                return await loop.run_in_executor(executor, self._safe_process, ticket_data)
+
+        outcomes = await asyncio.gather(*(run(t) for t in tickets))
+        return self._batch_report(outcomes, started)
+
     def run_weekly_audit(self):
         """Weekly business intelligence run."""
+        from agents.workflow_auditor import workflow_auditor_agent
+        from tools.analytics_tools import generate_weekly_report
+
         audit_result = workflow_auditor_agent()
         report = generate_weekly_report()
         return {"audit": audit_result, "report": report}
 
     def check_data(self, payload=None):
         """Run data quality / policy checks via Data Guardian."""
-        return data_guardian_agent(payload or {})
-
-    def log_event(self, ticket_id, event, data):
-        """Observability logging."""
-        with open("agent_logs.jsonl", "a", encoding="utf-8") as f:
-            f.write(
-                json.dumps(
-                    {
-                        "timestamp": pd.Timestamp.now().isoformat(),
-                        "ticket_id": ticket_id,
-                        "event": event,
-                        "data": data,
-                    }
-                )
-                + "\n"
-            )
+        from agents.data_guardian import data_guardian_agent
+
+        return data_guardian_agent(payload if payload is not None else {})
+
+    def log_event(self, ticket_id, event, data, step=None, duration_ms=None):
+        """Observability logging (buffered; see tools/event_log.py)."""
+        record = {
+            "timestamp": datetime.now().isoformat(),
+            "ticket_id": ticket_id,
+            "event": event,
+            "data": data,
+        }
+        if step is not None:
+            record["step"] = step
+        if duration_ms is not None:
+            record["duration_ms"] = round(duration_ms, 3)
+        self.event_log.emit(record)
+
+    def flush_events(self):
+        """Force buffered events to disk (also done automatically at exit)."""
+        self.event_log.flush()
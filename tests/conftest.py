@@ -0,0 +1,23 @@
+import os
+import sys
+import tempfile
+
+# config reads these at import time, so they are set before any project import
+_workdir = tempfile.mkdtemp(prefix="ef_tests_")
+os.environ["DB_PATH"] = os.path.join(_workdir, "test.db")
+os.environ["EVENT_LOG_PATH"] = os.path.join(_workdir, "agent_logs.jsonl")
+os.environ["LLM_BACKEND"] = "offline"
+os.environ["LLM_OFFLINE_LATENCY_MS"] = "0"
+os.environ["LLM_CACHE_DB"] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def db():
+    from tools.data_layer import init_db
+
+    init_db()
+    yield
@@ -0,0 +1,49 @@
+import os
+
+from tools.analytics_engine import TicketAnalytics
+from tools.data_layer import create_ticket_from_result
+
+HEADER = "id,customer_id,channel,message,intent,priority,response_time,resolution,sentiment_score\n"
+ROWS = [
+    "1,1001,email,Payment failed,billing,high,120,pending,-0.8\n",
+    "2,1002,chat,Reset password,faq,low,45,auto_resolved,0.6\n",
+]
+
+
+def _csv(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)  # new inode, as when an export is replaced
+
+
+def test_saved_tickets_reach_the_metrics(tmp_path):
+    path = tmp_path / "tickets.csv"
+    _csv(path, HEADER + "".join(ROWS))
+    engine = TicketAnalytics(path=str(path))
+    before = engine.metrics()
+
+    create_ticket_from_result(
+        {"ticket_id": "live-1", "message": "Site is down", "priority": "high", "decision": "ESCALATE_HUMAN"}
+    )
+    create_ticket_from_result(
+        {"ticket_id": "live-2", "message": "Hours?", "priority": "low", "decision": "AUTO_RESOLVE"}
+    )
+    after = engine.metrics()
+
+    assert after["total_tickets"] == before["total_tickets"] + 2
+    assert after["high_priority"] == before["high_priority"] + 1
+    assert engine.priority_counts()["low"] >= 2
+
+
+def test_replaced_file_keeps_last_snapshot_until_rows_arrive(tmp_path):
+    path = tmp_path / "tickets.csv"
+    _csv(path, HEADER + "".join(ROWS))
+    engine = TicketAnalytics(path=str(path))
+    first = engine.metrics()
+
+    _csv(path, HEADER + "3,1003,email,Half written")  # replacement still being written
+    assert engine.metrics() == first
+
+    _csv(path, HEADER + ROWS[0])
+    assert engine.metrics()["total_tickets"] == first["total_tickets"] - 1
@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+from agents.data_guardian import data_guardian_agent, load_dataset
+from tools.data_layer import data_quality_runs_version
+
+
+def test_unknown_dataset_ref_raises():
+    with pytest.raises(ValueError):
+        load_dataset("no_such_file_or_source.csv")
+
+
+def test_empty_dataset_is_not_saved_as_clean(tmp_path):
+    path = tmp_path / "empty.csv"
+    pd.DataFrame(columns=["id", "email"]).to_csv(path, index=False)
+    before = data_quality_runs_version()
+
+    result = data_guardian_agent({"dataset": str(path)})
+
+    assert result["error"]
+    assert result["quality_score"] is None
+    assert data_quality_runs_version() == before
+
+
+def test_known_source_is_loaded(tmp_path):
+    from tools.data_tools import ingest_csv
+
+    path = tmp_path / "source.csv"
+    pd.DataFrame({"id": [1, 2], "email": ["a@example.com", "b@example.com"]}).to_csv(path, index=False)
+    ingest_csv(str(path))
+    path.unlink()  # now only resolvable as a unified_data source_id
+
+    name, df = load_dataset(str(path))
+    assert len(df) == 2
+
+
+def test_parallel_profile_matches_serial(monkeypatch):
+    from agents import data_guardian
+
+    df = pd.DataFrame(
+        {f"col{i}": [j % 7 if i % 2 else None if j % 5 == 0 else f"v{j % 3}" for j in range(300)] for i in range(6)}
+    )
+    df["email"] = ["bad-address" if j % 10 == 0 else f"u{j}@example.com" for j in range(300)]
+    df = pd.concat([df, df.head(20)], ignore_index=True)
+    serial = data_guardian.check_basic_quality(df)
+
+    monkeypatch.setattr(data_guardian, "GUARDIAN_MAX_WORKERS", 3)
+    monkeypatch.setattr(data_guardian, "GUARDIAN_PARALLEL_MIN_COLUMNS", 2)
+    monkeypatch.setattr(data_guardian, "GUARDIAN_PARALLEL_MIN_CELLS", 0)
+    parallel = data_guardian.check_basic_quality(df)
+
+    for key in ("quality_score", "issues", "issue_count", "pii_columns", "row_count", "column_count"):
+        assert parallel[key] == serial[key]
+    assert any(issue["type"] == "DuplicateRows" for issue in parallel["issues"])
+
+
+def test_llm_failure_still_saves_rule_based_run(monkeypatch):
+    from agents import data_guardian
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("backend down")
+
+    monkeypatch.setattr(data_guardian, "generate_text", fail)
+    df = pd.DataFrame({"id": [1, 2, 3], "sla_hours": [24, None, 48]})
+    before = data_quality_runs_version()
+
+    result = data_guardian_agent({"dataset": df})
+
+    assert result["raw_llm_text"] is None
+    assert result["quality_score"] < 1.0
+    assert data_quality_runs_version() != before
+
+
+def test_range_overrides_keep_other_default_ranges():
+    from agents.data_guardian import check_basic_quality
+
+    df = pd.DataFrame({"age": [30, 200], "sla_hours": [24, 1000]})
+    issues = check_basic_quality(df, ranges={"Age": (0, 300)})["issues"]
+
+    out_of_range = [i["detail"] for i in issues if i["type"] == "OutOfRange"]
+    assert len(out_of_range) == 1 and "sla_hours" in out_of_range[0]
@@ -0,0 +1,29 @@
+import threading
+
+from tools.db_pool import ConnectionPool
+
+
+def _use(pool):
+    pool.connection().execute("SELECT 1").fetchone()
+
+
+def test_connections_of_finished_threads_are_closed(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"))
+    for _ in range(20):
+        thread = threading.Thread(target=_use, args=(pool,))
+        thread.start()
+        thread.join()
+    _use(pool)  # opening a connection also sweeps dead threads
+
+    stats = pool.stats()
+    assert stats["connections_opened"] == 21
+    assert stats["connections_open"] <= 2
+    assert stats["connections_closed"] >= 19
+    pool.close_all()
+
+
+def test_connection_is_reused_within_a_thread(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"))
+    assert pool.connection() is pool.connection()
+    assert pool.stats()["connections_opened"] == 1
+    pool.close_all()
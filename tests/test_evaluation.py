@@ -0,0 +1,15 @@
+import evaluation
+from tools import llm_backends, llm_client
+
+
+def test_agent_version_covers_llm_plumbing(tmp_path, monkeypatch):
+    assert llm_client.__file__ in evaluation.SUPPORT_AGENT_DEPENDENCIES
+    assert llm_backends.__file__ in evaluation.SUPPORT_AGENT_DEPENDENCIES
+
+    before = evaluation.support_agent_version()
+    changed = tmp_path / "llm_backends.py"
+    changed.write_text(open(llm_backends.__file__).read() + "\n# changed\n")
+    deps = tuple(str(changed) if d == llm_backends.__file__ else d for d in evaluation.SUPPORT_AGENT_DEPENDENCIES)
+    monkeypatch.setattr(evaluation, "SUPPORT_AGENT_DEPENDENCIES", deps)
+
+    assert evaluation.support_agent_version() != before
@@ -0,0 +1,40 @@
+import json
+import random
+import threading
+import time
+
+from tools.event_log import EventLogSink
+
+
+class _SlowDrainSink(EventLogSink):
+    """Widens the gap between draining a batch and writing it."""
+
+    def _drain(self):
+        lines = super()._drain()
+        time.sleep(random.uniform(0, 0.003))
+        return lines
+
+
+def test_concurrent_flushes_keep_emit_order(tmp_path):
+    path = tmp_path / "events.jsonl"
+    sink = _SlowDrainSink(path=str(path), capacity=100_000, batch_size=1, flush_interval_s=0.001)
+    done = threading.Event()
+
+    def flusher():
+        while not done.is_set():
+            sink.flush()
+
+    flushers = [threading.Thread(target=flusher) for _ in range(4)]
+    for thread in flushers:
+        thread.start()
+    for seq in range(2000):
+        sink.emit({"seq": seq})
+        if seq % 50 == 0:
+            time.sleep(0.001)
+    done.set()
+    for thread in flushers:
+        thread.join()
+    sink.close()
+
+    seqs = [json.loads(line)["seq"] for line in path.read_text().splitlines()]
+    assert seqs == list(range(2000))
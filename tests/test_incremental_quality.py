@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from tools.incremental_quality import run_incremental_quality
+from tools.profiler import profile_dataframe
+
+
+def _dataset_with_cross_partition_duplicates():
+    unique = pd.DataFrame({"id": range(1000), "city": ["Pune"] * 1000, "amount": range(1000)})
+    # 100 copies of rows from the first partition, placed in the last one
+    return pd.concat([unique, unique.iloc[:100]], ignore_index=True)
+
+
+@pytest.mark.parametrize("mode", ["rows", "hash"])
+def test_duplicates_across_partitions_are_counted(mode):
+    df = _dataset_with_cross_partition_duplicates()
+    assert profile_dataframe(df).summary()["duplicate_rows"] == 100
+
+    name = f"cross_partition_dups_{mode}"
+    first = run_incremental_quality(df, dataset_name=name, mode=mode, partition_rows=300)
+    assert first["duplicate_rows"] == 100
+
+    # Unchanged re-upload reuses stored partitions and must agree
+    second = run_incremental_quality(df, dataset_name=name, mode=mode, partition_rows=300)
+    assert second["incremental"]["profiled"] == 0
+    assert second["duplicate_rows"] == 100
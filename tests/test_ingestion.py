@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from tools.data_tools import _source_row_count, ingest_csv_stream
+
+
+def _write(path, amounts):
+    pd.DataFrame(
+        {
+            "id": range(len(amounts)),
+            "name": [f"customer {i}" for i in range(len(amounts))],
+            "amount": amounts,
+        }
+    ).to_csv(path, index=False)
+
+
+def _source_rows(source_id, storage="json"):
+    return _source_row_count(source_id, storage)
+
+
+@pytest.mark.parametrize("storage", ["json", "columnar"])
+def test_editing_one_cell_updates_one_row(tmp_path, storage):
+    path = tmp_path / f"edit_{storage}.csv"
+    amounts = [round(i * 1.5, 2) for i in range(1000)]
+    _write(path, amounts)
+    first = ingest_csv_stream(str(path), chunk_size=300, storage=storage, key_column="id")
+    assert first["inserted"] == 1000
+
+    amounts[500] = "unknown"  # turns the column from float to object dtype
+    _write(path, amounts)
+    second = ingest_csv_stream(str(path), chunk_size=300, storage=storage, key_column="id")
+
+    assert second["inserted"] == 0
+    assert second["updated"] == 1
+    assert second["unchanged"] == 999
+
+
+def test_editing_one_cell_without_key_adds_only_that_row(tmp_path):
+    path = tmp_path / "edit_nokey.csv"
+    amounts = [round(i * 1.5, 2) for i in range(1000)]
+    _write(path, amounts)
+    ingest_csv_stream(str(path), chunk_size=300)
+
+    amounts[500] = "unknown"
+    _write(path, amounts)
+    second = ingest_csv_stream(str(path), chunk_size=300)
+
+    # Content-hash keys: the edited row is a new row and its old version is removed
+    assert second["inserted"] == 1
+    assert second["deleted"] == 1
+    assert second["unchanged"] == 999
+    assert _source_rows(str(path)) == 1000
+
+
+@pytest.mark.parametrize("storage", ["json", "columnar"])
+def test_rows_removed_from_the_file_are_deleted(tmp_path, storage):
+    path = tmp_path / f"removed_{storage}.csv"
+    _write(path, [1.0, 2.0, 3.0, 4.0])
+    ingest_csv_stream(str(path), storage=storage, key_column="id")
+
+    _write(path, [1.0, 2.0])
+    second = ingest_csv_stream(str(path), storage=storage, key_column="id")
+
+    assert second["deleted"] == 2
+    assert _source_rows(str(path), storage) == 2
+
+
+def test_same_file_into_another_storage_is_not_skipped(tmp_path):
+    path = tmp_path / "both_storages.csv"
+    _write(path, [1.0, 2.0, 3.0])
+    ingest_csv_stream(str(path), storage="json")
+
+    columnar = ingest_csv_stream(str(path), storage="columnar")
+
+    assert not columnar["skipped"]
+    assert _source_rows(str(path), "columnar") == 3
+    assert ingest_csv_stream(str(path), storage="columnar")["skipped"]
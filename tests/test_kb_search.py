@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from agents.omni_support import classify_intent, classify_priority, rule_decision
+from tools import support_tools
+from tools.kb_search import KnowledgeBase
+
+KB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "kb_articles.csv")
+AUTO_RESOLVE_CONFIDENCE = 0.8
+
+
+@pytest.fixture
+def kb(monkeypatch):
+    kb = KnowledgeBase(path=KB_PATH)
+    monkeypatch.setattr(support_tools, "get_knowledge_base", lambda: kb)
+    return kb
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["I want to cancel my order", "I need a receipt for my company", "My order is wrong"],
+)
+def test_near_miss_queries_are_not_auto_resolved(kb, query):
+    confidence = support_tools.search_kb(query)["confidence"]
+    assert confidence < AUTO_RESOLVE_CONFIDENCE
+    intent = classify_intent(query, confidence)
+    assert rule_decision(intent, classify_priority(query), confidence) != "AUTO_RESOLVE"
+
+
+@pytest.mark.parametrize(
+    "query", ["Where is my order?", "How do I reset password?", "App crashes on startup"]
+)
+def test_full_phrase_matches_keep_high_confidence(kb, query):
+    assert support_tools.search_kb(query)["confidence"] >= AUTO_RESOLVE_CONFIDENCE
+
+
+def test_search_during_refresh_sees_a_complete_index(tmp_path):
+    import shutil
+    import threading
+
+    path = tmp_path / "kb.csv"
+    shutil.copy(KB_PATH, path)
+    kb = KnowledgeBase(path=str(path))
+    kb.refresh()
+    errors = []
+    stop = threading.Event()
+
+    def searcher():
+        while not stop.is_set():
+            try:
+                index = kb.snapshot()
+                for doc_id, _ in index.search("payment failed refund order"):
+                    index.articles[doc_id]["answer"]
+                    index.keyword_coverage(doc_id, "payment failed")
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+    threads = [threading.Thread(target=searcher) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for _ in range(200):
+        kb.refresh(force=True)
+    stop.set()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def test_add_article_copies_only_the_touched_posting_lists():
+    kb = KnowledgeBase(path=KB_PATH)
+    before = kb.snapshot()
+    baseline = before.search("refund request", top_k=3)
+
+    kb.add_article(
+        {"title": "Gift card balance", "keywords": "gift card balance", "answer": "Check the balance online."},
+        persist=False,
+    )
+    after = kb.snapshot()
+
+    assert after is not before
+    assert before.search("refund request", top_k=3) == baseline
+    assert after.search("gift card balance", top_k=1)[0][0] == len(after.articles) - 1
+    # Terms the new article does not use keep the very same posting lists
+    untouched = next(term for term in before._postings if term not in ("gift", "card", "balance", "check", "online"))
+    assert after._postings[untouched] is before._postings[untouched]
+    assert after._postings["card"] is not before._postings.get("card")
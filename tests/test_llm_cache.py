@@ -0,0 +1,29 @@
+from types import SimpleNamespace
+
+from tools import llm_cache
+from tools.db_pool import get_pool
+from tools.llm_cache import ResponseCache
+
+
+def _disk_rows(db_path):
+    return get_pool(db_path).connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+def test_expired_disk_rows_are_purged_on_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "PURGE_EVERY", 10)
+    db_path = str(tmp_path / "llm_cache.db")
+    cache = ResponseCache(max_entries=100, db_path=db_path)
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=lambda: now[0]))
+
+    for i in range(10):
+        cache.put(f"old{i}", "text", ttl=5)
+    assert _disk_rows(db_path) == 10
+
+    now[0] += 60  # everything written so far has expired
+    for i in range(10):
+        cache.put(f"new{i}", "text", ttl=5)
+
+    assert _disk_rows(db_path) == 10
+    assert cache.stats()["purged_expired"] == 10
+    assert cache.get("new3") == "text"
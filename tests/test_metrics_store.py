@@ -0,0 +1,50 @@
+import pandas as pd
+
+from tools.data_tools import ingest_csv_stream
+from tools.metrics_store import source_stats
+
+
+def test_columnar_sources_appear_in_source_stats(tmp_path):
+    path = tmp_path / "columnar_metrics.csv"
+    pd.DataFrame({"id": range(250), "amount": [i * 2 for i in range(250)]}).to_csv(path, index=False)
+    ingest_csv_stream(str(path), chunk_size=100, storage="columnar", key_column="id")
+
+    stats = source_stats(limit=1000)
+    sources = {s["source_id"]: s for s in stats["top_sources"]}
+    assert sources[str(path)]["rows"] == 250
+    assert stats["total_rows"] >= 250
+
+
+def _sla_rows():
+    from tools.db_pool import get_connection
+
+    rows = get_connection().execute(
+        "SELECT day, priority, resolved_count, breached_count, resolution_hours_total "
+        "FROM metrics_ticket_sla ORDER BY day, priority"
+    )
+    return [tuple(row[:4]) + (round(row[4], 6),) for row in rows]
+
+
+def test_unparseable_ticket_timestamps_do_not_block_saves():
+    from tools.data_layer import create_ticket_from_result
+    from tools.metrics_store import rebuild_metrics
+
+    for ticket_id, created_at in (("bad-date-1", "01/02/2025 10:00"), ("bad-date-2", "yesterday")):
+        create_ticket_from_result(
+            {"ticket_id": ticket_id, "message": "m", "status": "resolved", "created_at": created_at}
+        )
+    create_ticket_from_result(
+        {
+            "ticket_id": "good-date",
+            "message": "m",
+            "priority": "high",
+            "status": "resolved",
+            "created_at": "2025-01-02T10:00:00",
+            "resolved_at": "2025-01-02T16:00:00",
+        }
+    )
+
+    from_triggers = _sla_rows()
+    assert ("2025-01-02", "high", 1, 1, 6.0) in from_triggers
+    rebuild_metrics()
+    assert _sla_rows() == from_triggers
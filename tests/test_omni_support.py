@@ -0,0 +1,44 @@
+import pytest
+
+from agents import omni_support
+from agents.omni_support import classify_intent, classify_priority
+
+
+@pytest.mark.parametrize(
+    "message",
+    ["Please discard my old draft", "Moving to the border region", "What a terror of a week", "Resorting my list"],
+)
+def test_keywords_inside_other_words_do_not_match(message):
+    assert classify_intent(message, 0.5) == "complex"
+    assert classify_priority(message) == "medium"
+
+
+@pytest.mark.parametrize(
+    "message, intent",
+    [
+        ("Two payments were taken", "billing"),
+        ("The app crashed again", "bug"),
+        ("Where are my orders?", "shipping"),
+        ("I want a refund", "refund"),
+    ],
+)
+def test_inflected_keywords_still_match(message, intent):
+    assert classify_intent(message, 0.5) == intent
+
+
+def test_llm_values_outside_the_allowed_sets_are_ignored(monkeypatch):
+    monkeypatch.setattr(
+        omni_support,
+        "_llm_decision",
+        lambda *args: {"decision": "CONTINUE_CONVERSATION", "intent": "weather", "priority": "URGENT!!"},
+    )
+    monkeypatch.setattr(omni_support, "rule_decision", lambda *args: None)
+
+    result = omni_support.omni_support_agent(
+        {"id": "t-llm", "customer_id": "1001", "channel": "chat", "message": "Something odd happened"},
+        persist=False,
+    )
+
+    assert result["decision_tier"] == "llm"
+    assert result["intent"] in omni_support.INTENTS
+    assert result["priority"] in omni_support.PRIORITIES
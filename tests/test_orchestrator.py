@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+
+from orchestrator import EnterpriseFusionOrchestrator
+from tools.db_pool import pool_stats
+
+TICKET = {"customer_id": "1001", "channel": "chat", "message": "My payment failed 3 times"}
+
+
+def _batch(n, prefix):
+    return [dict(TICKET, id=f"{prefix}{i}") for i in range(n)]
+
+
+def test_batches_reuse_worker_threads_and_connections():
+    orchestrator = EnterpriseFusionOrchestrator()
+    try:
+        orchestrator.process_tickets_batch(_batch(8, "warm"), max_workers=4)
+        opened = pool_stats()["connections_opened"]
+        for b in range(30):
+            report = orchestrator.process_tickets_batch(_batch(8, f"b{b}-"), max_workers=4)
+            assert report["stats"]["failed"] == 0
+        # Idle pool threads may still open their first connection, never more than one each
+        assert pool_stats()["connections_opened"] - opened <= 4
+    finally:
+        orchestrator.close()
+
+
+def test_async_batch_uses_the_same_pool():
+    orchestrator = EnterpriseFusionOrchestrator()
+    try:
+        report = asyncio.run(orchestrator.aprocess_tickets_batch(_batch(6, "async")))
+        assert report["stats"]["succeeded"] == 6
+    finally:
+        orchestrator.close()
+
+
+class _CountingOrchestrator(EnterpriseFusionOrchestrator):
+    """Records the most tickets ever in flight at once."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def process_ticket(self, ticket_data):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self.in_flight -= 1
+        return {"ticket_id": ticket_data["id"]}
+
+
+def test_batch_limits_bound_concurrency_on_one_pool():
+    orchestrator = _CountingOrchestrator()
+    try:
+        report = orchestrator.process_tickets_batch(_batch(12, "sync"), max_workers=2)
+        assert [r["ticket_id"] for r in report["results"]] == [f"sync{i}" for i in range(12)]
+        assert orchestrator.peak <= 2
+        executor = orchestrator._get_executor()
+
+        orchestrator.peak = 0
+        report = asyncio.run(orchestrator.aprocess_tickets_batch(_batch(12, "async"), max_concurrency=3))
+        assert report["stats"]["succeeded"] == 12
+        assert orchestrator.peak <= 3
+        assert orchestrator._get_executor() is executor
+    finally:
+        orchestrator.close()
+
+
+def test_concurrent_batches_with_different_limits_both_finish():
+    orchestrator = _CountingOrchestrator()
+    reports = []
+    try:
+        threads = [
+            threading.Thread(
+                target=lambda n=n: reports.append(
+                    orchestrator.process_tickets_batch(_batch(10, f"c{n}-"), max_workers=n)
+                )
+            )
+            for n in (1, 4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(r["stats"]["succeeded"] for r in reports) == [10, 10]
+    finally:
+        orchestrator.close()
@@ -0,0 +1,39 @@
+from orchestrator import EnterpriseFusionOrchestrator
+from tools.workflow_tools import analyze_logs
+
+
+def _step(summary, name):
+    return next((s for s in summary["steps"] if s["step"] == name), None)
+
+
+def test_audit_sees_events_still_in_the_buffer():
+    orchestrator = EnterpriseFusionOrchestrator()
+    orchestrator.log_event("wf-1", "processed", {}, step="buffered_step", duration_ms=120)
+
+    step = _step(analyze_logs(), "buffered_step")
+
+    assert step is not None and step["volume"] == 1
+
+
+def test_non_object_json_lines_are_skipped(tmp_path):
+    log = tmp_path / "events.jsonl"
+    log.write_text(
+        "\n".join(
+            [
+                '[1, 2, 3]',
+                '42',
+                '"just a string"',
+                'null',
+                '{"step": "ok_step", "event": "processed", "duration_ms": 50}',
+                '{"step": "ok_step", "event": "processed", "data": [1], "duration_ms": "slow"}',
+                "not json",
+            ]
+        )
+        + "\n"
+    )
+
+    summary = analyze_logs(log_path=str(log), workflows_path=str(tmp_path / "missing.csv"))
+
+    assert summary["sources"]["events"] == 2
+    assert summary["sources"]["bad_lines"] == 5
+    assert _step(summary, "ok_step")["volume"] == 2
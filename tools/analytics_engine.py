@@ -0,0 +1,208 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import Counter
+
+from tools.db_pool import get_connection
+
+TICKETS_CSV_PATH = "data/tickets.csv"
+
+# Bytes just before the consumed offset that must be unchanged for an
+# append-only delta read; anything else triggers a full rebuild.
+_TAIL_CHECK_BYTES = 256
+# tickets rows read per query when catching up with the database
+_DB_BATCH = 10_000
+
+
+class _Aggregates:
+    """Counters for one ticket source."""
+
+    def __init__(self):
+        self.total = 0
+        self.by_resolution = Counter()
+        self.by_priority = Counter()
+        self.response_time_sum = 0.0
+        self.response_time_count = 0
+
+    def add(self, resolution, priority, response_time=None):
+        self.total += 1
+        self.by_resolution[resolution] += 1
+        self.by_priority[priority] += 1
+        if response_time not in (None, ""):
+            try:
+                self.response_time_sum += float(response_time)
+                self.response_time_count += 1
+            except ValueError:
+                pass
+
+
+class _CsvTail(_Aggregates):
+    """Aggregates of a CSV file plus how far into it they have read."""
+
+    def __init__(self):
+        super().__init__()
+        self.offset = 0
+        self.inode = None
+        self.mtime_ns = None
+        self.tail_digest = None
+        self.columns = None
+
+
+def _tail_digest_at(f, offset):
+    start = max(0, offset - _TAIL_CHECK_BYTES)
+    f.seek(start)
+    return hashlib.blake2b(f.read(offset - start), digest_size=16).digest()
+
+
+def _resolution(agent_result_json):
+    """CSV-style resolution of a saved ticket, from the agent decision stored with it."""
+    try:
+        decision = json.loads(agent_result_json or "{}").get("decision")
+    except (ValueError, AttributeError):
+        decision = None
+    return "auto_resolved" if decision == "AUTO_RESOLVE" else "pending"
+
+
+class TicketAnalytics:
+    """
+    Running ticket aggregates over the ticket history CSV and the tickets table.
+
+    The CSV (historical export) is tailed: a refresh only parses bytes
+    appended since the last one, and truncation, a replaced file, a rewrite
+    that keeps the size, or a change to the last consumed bytes causes a
+    full rebuild. Tickets saved since then live in SQLite and are folded in
+    by id, so only rows newer than the last seen id are read. Rebuilt
+    aggregates replace the current ones only once they hold data, so a
+    reset never shows empty metrics in between. Database tickets carry no
+    response_time, so avg_response_time comes from the CSV. Metric queries
+    read the aggregates and do not touch the ticket history.
+    """
+
+    def __init__(self, path=TICKETS_CSV_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._csv = _CsvTail()
+        self._db = _Aggregates()
+        self._last_ticket_id = 0
+
+    def _refresh_csv(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return  # keep the last snapshot until the file is back
+        tail = self._csv
+        if st.st_size == tail.offset and st.st_ino == tail.inode and st.st_mtime_ns == tail.mtime_ns:
+            return
+        with open(self.path, "rb") as f:
+            if (
+                st.st_ino != tail.inode
+                or st.st_size <= tail.offset
+                or _tail_digest_at(f, tail.offset) != tail.tail_digest
+            ):
+                tail = _CsvTail()  # rebuild; swapped in below once it has rows
+                tail.inode = st.st_ino
+
+            f.seek(tail.offset)
+            delta = f.read()
+            complete = len(delta)
+            if not delta.endswith(b"\n"):
+                # An unterminated last line counts only once all its fields exist;
+                # otherwise it is probably mid-write and waits for the next refresh.
+                last_line = delta.rfind(b"\n") + 1
+                fields = next(csv.reader([delta[last_line:].decode("utf-8", "replace")]), [])
+                if tail.columns is None or len(fields) < len(tail.columns):
+                    complete = last_line
+            if complete == 0:
+                return
+            text = delta[:complete].decode("utf-8-sig" if tail.offset == 0 else "utf-8")
+
+            reader = csv.reader(io.StringIO(text))
+            if tail.columns is None:
+                tail.columns = next(reader, None)
+            for values in reader:
+                if values:
+                    row = dict(zip(tail.columns, values))
+                    tail.add(row.get("resolution"), row.get("priority"), row.get("response_time"))
+
+            tail.offset += complete
+            tail.tail_digest = _tail_digest_at(f, tail.offset)
+            tail.mtime_ns = st.st_mtime_ns
+        if tail is self._csv or tail.total:
+            self._csv = tail
+
+    def _refresh_db(self):
+        conn = get_connection()
+        (max_id,) = conn.execute("SELECT COALESCE(MAX(id), 0) FROM tickets").fetchone()
+        if max_id == self._last_ticket_id:
+            return
+        db, last_id = self._db, self._last_ticket_id
+        if max_id < last_id:
+            db, last_id = _Aggregates(), 0  # table was recreated; rebuild
+        while True:
+            rows = conn.execute(
+                "SELECT id, priority, agent_result_json FROM tickets WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, _DB_BATCH),
+            ).fetchall()
+            for ticket_id, priority, agent_result_json in rows:
+                db.add(_resolution(agent_result_json), priority or "unknown")
+                last_id = ticket_id
+            if len(rows) < _DB_BATCH:
+                break
+        self._db, self._last_ticket_id = db, last_id
+
+    def refresh(self):
+        """Fold CSV rows and tickets added since the last refresh into the aggregates."""
+        with self._lock:
+            self._refresh_csv()
+            self._refresh_db()
+
+    def metrics(self):
+        """Weekly report metrics computed from the running aggregates."""
+        self.refresh()
+        with self._lock:
+            csv_, db = self._csv, self._db
+            total = csv_.total + db.total
+            auto_resolved = csv_.by_resolution["auto_resolved"] + db.by_resolution["auto_resolved"]
+            return {
+                "total_tickets": total,
+                "auto_resolved_rate": (auto_resolved / total) * 100 if total else 0.0,
+                "avg_response_time": (
+                    csv_.response_time_sum / csv_.response_time_count
+                    if csv_.response_time_count
+                    else None
+                ),
+                "high_priority": csv_.by_priority["high"] + db.by_priority["high"],
+            }
+
+    def priority_counts(self):
+        """Tickets per priority, most frequent first."""
+        self.refresh()
+        with self._lock:
+            return dict((self._csv.by_priority + self._db.by_priority).most_common())
+
+    def version(self):
+        """Cheap change marker: CSV size/mtime plus the newest ticket id."""
+        try:
+            st = os.stat(self.path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        (max_id,) = get_connection().execute("SELECT COALESCE(MAX(id), 0) FROM tickets").fetchone()
+        return signature, max_id
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_ticket_analytics():
+    """Return the process-wide ticket analytics engine."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = TicketAnalytics()
+    return _engine
@@ -1,27 +1,16 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import io
-import base64
+from tools.analytics_engine import get_ticket_analytics
+from tools.charts import bar_chart_data_url, bar_chart_spec
 
-def generate_weekly_report():
-    """Generate support analytics report"""
-    tickets = pd.read_csv('data/tickets.csv')
-    
-    metrics = {
-        'total_tickets': len(tickets),
-        'auto_resolved_rate': (len(tickets[tickets['resolution'] == 'auto_resolved']) / len(tickets)) * 100,
-        'avg_response_time': tickets['response_time'].mean(),
-        'high_priority': len(tickets[tickets['priority'] == 'high'])
-    }
-    
-    # Create chart
-    plt.figure(figsize=(10, 6))
-    tickets['priority'].value_counts().plot(kind='bar')
-    plt.title('Ticket Priority Distribution')
-    plt.ylabel('Count')
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    buf.seek(0)
-    chart_url = base64.b64encode(buf.read()).decode()
-    
-    return {'metrics': metrics, 'chart_url': f"data:image/png;base64,{chart_url}"}
+def generate_weekly_report(include_png=True):
+    """Generate support analytics report from the incremental ticket aggregates"""
+    engine = get_ticket_analytics()
+    metrics = engine.metrics()
+    priority_counts = engine.priority_counts()
+
+    # Chart: cached PNG (re-rendered only when the counts change) plus a JSON spec
+    title = 'Ticket Priority Distribution'
+    report = {'metrics': metrics, 'chart_spec': bar_chart_spec(priority_counts, title)}
+    if include_png:
+        report['chart_url'] = bar_chart_data_url(priority_counts, title)
+
+    return report
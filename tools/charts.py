@@ -0,0 +1,79 @@
+import base64
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+CHART_CACHE_SIZE = 32
+
+_cache = OrderedDict()  # content hash -> PNG data URL
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _chart_key(kind, data, title, ylabel, figsize):
+    payload = json.dumps([kind, list(data.items()), title, ylabel, figsize], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _render_bar_png(data, title, ylabel, figsize):
+    # matplotlib is imported here so importing this module stays cheap
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # Object-oriented Agg rendering: the figure is never registered with
+    # pyplot's global state, so it is freed as soon as it goes out of scope.
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.bar([str(k) for k in data], list(data.values()))
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+def bar_chart_data_url(data, title, ylabel="Count", figsize=(10, 6)):
+    """
+    Return a base64 PNG data URL for a bar chart of data ({label: value}).
+
+    Rendered images are cached by a hash of the data and labels, so an
+    unchanged chart is served without re-rendering.
+    """
+    key = _chart_key("bar", data, title, ylabel, figsize)
+    with _cache_lock:
+        url = _cache.get(key)
+        if url is not None:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return url
+        _cache_stats["misses"] += 1
+
+    png = _render_bar_png(data, title, ylabel, figsize)
+    url = f"data:image/png;base64,{base64.b64encode(png).decode()}"
+    with _cache_lock:
+        _cache[key] = url
+        while len(_cache) > CHART_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return url
+
+
+def bar_chart_spec(data, title, ylabel="Count"):
+    """Vega-Lite spec for the same bar chart, for clients that render charts themselves."""
+    return {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "title": title,
+        "data": {"values": [{"category": str(k), "value": v} for k, v in data.items()]},
+        "mark": "bar",
+        "encoding": {
+            "x": {"field": "category", "type": "nominal", "sort": None},
+            "y": {"field": "value", "type": "quantitative", "title": ylabel},
+        },
+    }
+
+
+def chart_cache_stats():
+    with _cache_lock:
+        return dict(_cache_stats, size=len(_cache))
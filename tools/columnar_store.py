@@ -0,0 +1,144 @@
+import hashlib
+import json
+import re
+from datetime import datetime
+
+from tools.db_pool import get_connection, transaction
+from tools.profiler import infer_type
+
+# Bookkeeping columns of every source table (not part of the source schema)
+ROW_KEY_COLUMN = "_row_key"
+ROW_HASH_COLUMN = "_row_hash"
+
+
+def table_name_for(source_id):
+    """Stable, SQL-safe table name for a source (slug plus a short hash)."""
+    slug = re.sub(r"\W+", "_", str(source_id).rsplit("/", 1)[-1]).strip("_").lower()[:40]
+    digest = hashlib.blake2b(str(source_id).encode(), digest_size=4).hexdigest()
+    return f"src_{slug}_{digest}"
+
+
+def quote(identifier):
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def sqlite_type(series):
+    """SQLite column type for a pandas Series."""
+    if series.dtype.kind in "iub":
+        return "INTEGER"
+    if infer_type(series) == "numeric":
+        return "REAL"
+    return "TEXT"
+
+
+def infer_schema(chunk):
+    return {str(name): sqlite_type(chunk[name]) for name in chunk.columns}
+
+
+def get_catalog_entry(source_id):
+    """Catalog row for a source as a dict (schema decoded), or None."""
+    row = get_connection().execute(
+        "SELECT * FROM source_catalog WHERE source_id = ?", (source_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    entry = dict(row)
+    entry["schema"] = json.loads(entry.pop("schema_json"))
+    return entry
+
+
+def list_catalog():
+    rows = get_connection().execute(
+        "SELECT source_id, table_name, storage, row_count, quality_score, last_ingested "
+        "FROM source_catalog ORDER BY source_id"
+    )
+    return [dict(row) for row in rows]
+
+
+def _ensure_table(conn, table, schema):
+    """Create the source table, adding any columns a later file introduced."""
+    schema = {**schema, ROW_KEY_COLUMN: "TEXT", ROW_HASH_COLUMN: "TEXT"}
+    columns = ", ".join(f"{quote(name)} {kind}" for name, kind in schema.items())
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {quote(table)} ({columns})")
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({quote(table)})")}
+    for name, kind in schema.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(name)} {kind}")
+    conn.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {quote(table + '_row_key')} "
+        f"ON {quote(table)} ({quote(ROW_KEY_COLUMN)})"
+    )
+
+
+def row_count(source_id):
+    """Refresh and return the catalog row count of a columnar source."""
+    with transaction() as conn:
+        table = table_name_for(source_id)
+        (count,) = conn.execute(f"SELECT COUNT(*) FROM {quote(table)}").fetchone()
+        conn.execute(
+            "UPDATE source_catalog SET row_count = ? WHERE source_id = ?", (count, source_id)
+        )
+    return count
+
+
+def _rows(chunk):
+    """Chunk rows as tuples of plain Python values with NaN mapped to NULL."""
+    return chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def write_chunk(source_id, chunk, row_keys, row_hashes, quality_score=None):
+    """
+    Upsert one DataFrame chunk into the source's typed table.
+
+    Rows are matched on row_keys; a matching row is rewritten only when its
+    content hash differs. The table is created from the chunk's inferred
+    schema on first write and the source is registered in source_catalog,
+    all in one transaction. Returns the number of rows inserted or updated.
+    """
+    table = table_name_for(source_id)
+    schema = infer_schema(chunk)
+    columns = list(schema) + [ROW_KEY_COLUMN, ROW_HASH_COLUMN]
+    names = ", ".join(quote(name) for name in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    updates = ", ".join(f"{quote(name)} = excluded.{quote(name)}" for name in columns)
+    rows = (
+        row + (key, digest) for row, key, digest in zip(_rows(chunk), row_keys, row_hashes)
+    )
+
+    with transaction() as conn:
+        entry = conn.execute(
+            "SELECT schema_json FROM source_catalog WHERE source_id = ?", (source_id,)
+        ).fetchone()
+        if entry is not None:
+            # Keep the first-seen type of existing columns
+            schema = {**schema, **json.loads(entry[0])}
+        _ensure_table(conn, table, schema)
+        cur = conn.executemany(
+            f"INSERT INTO {quote(table)} ({names}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({quote(ROW_KEY_COLUMN)}) DO UPDATE SET {updates} "
+            f"WHERE {quote(ROW_HASH_COLUMN)} IS NOT excluded.{quote(ROW_HASH_COLUMN)}",
+            rows,
+        )
+        conn.execute(
+            """
+            INSERT INTO source_catalog (
+                source_id, table_name, storage, schema_json, quality_score, last_ingested
+            )
+            VALUES (?, ?, 'columnar', ?, ?, ?)
+            ON CONFLICT (source_id) DO UPDATE SET
+                schema_json = excluded.schema_json,
+                quality_score = COALESCE(excluded.quality_score, quality_score),
+                last_ingested = excluded.last_ingested
+            """,
+            (source_id, table, json.dumps(schema), quality_score, datetime.utcnow().isoformat()),
+        )
+    return cur.rowcount
+
+
+def delete_rows_not_in(conn, source_id, keys_table):
+    """Delete rows of a columnar source whose row key is not listed in keys_table; returns the count."""
+    table = table_name_for(source_id)
+    return conn.execute(
+        f"DELETE FROM {quote(table)} WHERE {quote(ROW_KEY_COLUMN)} NOT IN "
+        f"(SELECT row_key FROM {keys_table})"
+    ).rowcount
@@ -1,61 +1,14 @@
-import sqlite3
 import json
 from datetime import datetime
-from config import DB_PATH, logger
-
-
-def get_connection():
-    """Return a SQLite connection; caller must close()."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+from config import logger
+from tools.db_pool import get_connection, transaction
+from tools.migrations import migrate
 
 
 def init_db():
-    """Create required tables if they do not exist."""
-    conn = get_connection()
-    try:
-        cur = conn.cursor()
-
-        # Tickets table
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS tickets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                ticket_id TEXT,
-                customer_id TEXT,
-                channel TEXT,
-                message TEXT,
-                intent TEXT,
-                priority TEXT,
-                status TEXT,
-                created_at TEXT,
-                resolved_at TEXT,
-                agent_result_json TEXT
-            );
-            """
-        )
-
-        # Data quality runs table
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS data_quality_runs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                dataset_name TEXT,
-                uploaded_by TEXT,
-                uploaded_at TEXT,
-                row_count INTEGER,
-                issue_count INTEGER,
-                score REAL,
-                result_json TEXT
-            );
-            """
-        )
-
-        conn.commit()
-        logger.info("DB init: tickets and data_quality_runs tables ready")
-    finally:
-        conn.close()
+    """Create or upgrade all tables and indexes via the migration layer."""
+    version = migrate()
+    logger.info("DB init: schema at version %s", version)
 
 
 # ---------------- Tickets helpers ----------------
@@ -76,8 +29,7 @@ def create_ticket_from_result(result: dict):
     - created_at (optional)
     - resolved_at (optional)
     """
-    conn = get_connection()
-    try:
+    with transaction() as conn:
         cur = conn.cursor()
 
         ticket_id = result.get("ticket_id")
@@ -100,6 +52,8 @@ def create_ticket_from_result(result: dict):
 
         created_at = result.get("created_at") or datetime.utcnow().isoformat()
         resolved_at = result.get("resolved_at")
+        if resolved_at is None and status == "resolved":
+            resolved_at = created_at  # resolved on intake
 
         agent_result_json = json.dumps(result, ensure_ascii=False)
 
@@ -132,40 +86,34 @@ def create_ticket_from_result(result: dict):
                 agent_result_json,
             ),
         )
-        conn.commit()
-        logger.info("Ticket saved to DB", extra={"ticket_id": ticket_id})
-    finally:
-        conn.close()
+    logger.info("Ticket saved to DB", extra={"ticket_id": ticket_id})
 
 
 def list_tickets_for_customer(customer_id: str, limit: int = 10):
     """Return recent tickets for a customer as list[dict]."""
     conn = get_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT
-                ticket_id,
-                customer_id,
-                channel,
-                message,
-                intent,
-                priority,
-                status,
-                created_at,
-                resolved_at
-            FROM tickets
-            WHERE customer_id = ?
-            ORDER BY created_at DESC, id DESC
-            LIMIT ?
-            """,
-            (customer_id, limit),
-        )
-        rows = cur.fetchall()
-        return [dict(r) for r in rows]
-    finally:
-        conn.close()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT
+            ticket_id,
+            customer_id,
+            channel,
+            message,
+            intent,
+            priority,
+            status,
+            created_at,
+            resolved_at
+        FROM tickets
+        WHERE customer_id = ?
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+        """,
+        (customer_id, limit),
+    )
+    rows = cur.fetchall()
+    return [dict(r) for r in rows]
 
 
 # ---------------- Data quality helpers ----------------
@@ -178,10 +126,16 @@ def save_data_quality_run(
     issue_count: int,
     score: float,
     result: dict,
+    partitions: list = None,
 ):
-    """Insert one data quality run into the DB."""
-    conn = get_connection()
-    try:
+    """
+    Insert one data quality run into the DB and return its id.
+
+    partitions (optional) is a list of dicts with partition_key, fingerprint,
+    row_count and profile_json; they replace the dataset's stored partitions
+    so the next incremental run can reuse unchanged ones.
+    """
+    with transaction() as conn:
         cur = conn.cursor()
         uploaded_at = datetime.utcnow().isoformat()
         result_json = json.dumps(result, ensure_ascii=False)
@@ -209,37 +163,138 @@ def save_data_quality_run(
                 result_json,
             ),
         )
-        conn.commit()
-        logger.info(
-            "Saved data_quality_run",
-            extra={"dataset_name": dataset_name, "row_count": row_count, "score": score},
-        )
-    finally:
-        conn.close()
+        run_id = cur.lastrowid
+
+        if partitions is not None:
+            cur.execute(
+                "DELETE FROM data_quality_partitions WHERE dataset_name = ?",
+                (dataset_name,),
+            )
+            cur.executemany(
+                """
+                INSERT INTO data_quality_partitions (
+                    run_id,
+                    dataset_name,
+                    partition_key,
+                    fingerprint,
+                    row_count,
+                    profile_json
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    (
+                        run_id,
+                        dataset_name,
+                        p["partition_key"],
+                        p["fingerprint"],
+                        p["row_count"],
+                        p["profile_json"],
+                    )
+                    for p in partitions
+                ),
+            )
+    logger.info(
+        "Saved data_quality_run",
+        extra={"dataset_name": dataset_name, "row_count": row_count, "score": score},
+    )
+    return run_id
 
 
 def list_data_quality_runs(limit: int = 10):
     """Return recent data quality runs as list[dict]."""
     conn = get_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT
+            id,
+            dataset_name,
+            uploaded_by,
+            uploaded_at,
+            row_count,
+            issue_count,
+            score
+        FROM data_quality_runs
+        ORDER BY uploaded_at DESC, id DESC
+        LIMIT ?
+        """,
+        (limit,),
+    )
+    rows = cur.fetchall()
+    return [dict(r) for r in rows]
+
+
+def data_quality_runs_version():
+    """Cheap change marker for data_quality_runs (id of the newest run, 0 if none)."""
+    row = get_connection().execute("SELECT MAX(id) FROM data_quality_runs").fetchone()
+    return row[0] or 0
+
+
+def get_quality_partitions(dataset_name: str):
+    """Return the stored partitions of a dataset as {partition_key: dict}."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT
+            partition_key,
+            fingerprint,
+            row_count,
+            profile_json
+        FROM data_quality_partitions
+        WHERE dataset_name = ?
+        """,
+        (dataset_name,),
+    )
+    return {r["partition_key"]: dict(r) for r in cur.fetchall()}
+
+
+# ---------------- Evaluation cache helpers ----------------
+
+
+def get_eval_results(suite: str, agent_version: str):
+    """Return cached per-case evaluation results as {input_hash: result dict}."""
+    rows = get_connection().execute(
+        """
+        SELECT input_hash, result_json
+        FROM eval_case_results
+        WHERE suite = ? AND agent_version = ?
+        """,
+        (suite, agent_version),
+    )
+    return {r["input_hash"]: json.loads(r["result_json"]) for r in rows}
+
+
+def save_eval_results(suite: str, agent_version: str, cases: list):
+    """Upsert (case_id, input_hash, result) tuples into the evaluation cache."""
+    created_at = datetime.utcnow().isoformat()
+    with transaction() as conn:
+        conn.executemany(
             """
-            SELECT
-                id,
-                dataset_name,
-                uploaded_by,
-                uploaded_at,
-                row_count,
-                issue_count,
-                score
-            FROM data_quality_runs
-            ORDER BY uploaded_at DESC, id DESC
-            LIMIT ?
+            INSERT INTO eval_case_results (
+                suite,
+                input_hash,
+                agent_version,
+                case_id,
+                result_json,
+                created_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (suite, agent_version, input_hash) DO UPDATE SET
+                case_id = excluded.case_id,
+                result_json = excluded.result_json,
+                created_at = excluded.created_at
             """,
-            (limit,),
+            (
+                (
+                    suite,
+                    input_hash,
+                    agent_version,
+                    case_id,
+                    json.dumps(result, ensure_ascii=False),
+                    created_at,
+                )
+                for case_id, input_hash, result in cases
+            ),
         )
-        rows = cur.fetchall()
-        return [dict(r) for r in rows]
-    finally:
-        conn.close()
@@ -1,39 +1,508 @@
+import hashlib
+import os
 import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
 import pandas as pd
 import json
-from config import DB_PATH
+from config import INGEST_STORAGE, QUERY_MAX_ROWS, QUERY_PAGE_SIZE, QUERY_TIMEOUT_S, logger
+from tools import columnar_store
+from tools.db_pool import get_connection, transaction
+from tools.migrations import migrate
+from tools.profiler import row_hashes
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module
+    resource = None
+
+# Rows read from the CSV per chunk; bounds memory regardless of file size.
+INGEST_CHUNK_SIZE = 50_000
+
+# Rows are matched on (source_id, row_key) and rewritten only if their content changed
+UPSERT_UNIFIED_SQL = """
+    INSERT INTO unified_data (source_id, data_type, raw_data, quality_score, row_hash, row_key)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (source_id, row_key) DO UPDATE SET
+        raw_data = excluded.raw_data,
+        quality_score = excluded.quality_score,
+        row_hash = excluded.row_hash,
+        ingested_at = CURRENT_TIMESTAMP
+    WHERE row_hash IS NOT excluded.row_hash
+"""
+
+UNIFIED_COLUMNS = (
+    "id", "source_id", "data_type", "raw_data", "cleaned_data", "quality_score", "ingested_at",
+)
+# Projection used unless columns are requested; leaves out the JSON blobs
+DEFAULT_UNIFIED_COLUMNS = ("id", "source_id", "data_type", "quality_score", "ingested_at")
+
+# Statement actions allowed in ad-hoc queries; anything else is denied at prepare time
+_READ_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+}
+# SQLite VM instructions between deadline checks
+_PROGRESS_STEPS = 10_000
+
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS unified_data (
-            id INTEGER PRIMARY KEY,
-            source_id TEXT,
-            data_type TEXT,
-            raw_data TEXT,
-            cleaned_data TEXT,
-            quality_score REAL,
-            ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.close()
+    """Create or upgrade the unified store schema (see tools/migrations.py)."""
+    migrate()
 
-def ingest_csv(file_path):
-    """Ingest CSV data into unified store"""
-    df = pd.read_csv(file_path)
-    conn = sqlite3.connect(DB_PATH)
-    for _, row in df.iterrows():
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)."""
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def file_fingerprint(file_path, block_size=1 << 20):
+    """Content digest of a file, read in fixed-size blocks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _completed_manifest(source_id, fingerprint, storage):
+    row = get_connection().execute(
+        """
+        SELECT id, finished_at FROM ingestion_manifests
+        WHERE source_id = ? AND file_fingerprint = ? AND storage = ? AND status = 'completed'
+        ORDER BY id DESC LIMIT 1
+        """,
+        (source_id, fingerprint, storage),
+    ).fetchone()
+    return dict(row) if row is not None else None
+
+
+def _source_row_count(source_id, storage):
+    if storage == "columnar":
+        if columnar_store.get_catalog_entry(source_id) is None:
+            return 0
+        return columnar_store.row_count(source_id)
+    (count,) = get_connection().execute(
+        "SELECT COUNT(*) FROM unified_data WHERE source_id = ?", (source_id,)
+    ).fetchone()
+    return count
+
+
+def _record_keys(conn, keys_table, keys):
+    conn.executemany(f"INSERT OR IGNORE INTO {keys_table} (row_key) VALUES (?)", ((k,) for k in keys))
+
+
+def _delete_missing_rows(source_id, storage, keys_table):
+    """Delete the source's rows whose key the file no longer has; returns the count."""
+    with transaction() as conn:
+        if storage == "columnar":
+            if columnar_store.get_catalog_entry(source_id) is None:
+                return 0
+            return columnar_store.delete_rows_not_in(conn, source_id, keys_table)
+        # Rows stored before row keys existed have none and are left alone
+        return conn.execute(
+            f"""
+            DELETE FROM unified_data
+            WHERE source_id = ? AND row_key IS NOT NULL
+              AND row_key NOT IN (SELECT row_key FROM {keys_table})
+            """,
+            (source_id,),
+        ).rowcount
+
+
+def _row_keys(raw_chunk, key_column, hashes):
+    """Upsert keys: the key column's CSV text, or the content hash (which dedups rows)."""
+    if key_column is not None:
+        return raw_chunk[key_column].tolist()
+    return [f"{h:016x}" for h in hashes.tolist()]
+
+
+# Field texts read_csv treats as missing by default
+CSV_NA_VALUES = frozenset(
+    {
+        "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+        "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    }
+)
+_CSV_BOOLS = {"true": True, "false": False}
+
+
+def _typed(raw_chunk):
+    """Typed copy of an all-text chunk: numeric and boolean columns are inferred as read_csv does."""
+    columns = {}
+    for name, text in raw_chunk.items():
+        text = text.mask(text.isin(CSV_NA_VALUES))
+        present = int(text.notna().sum())
+        numeric = pd.to_numeric(text, errors="coerce")
+        if int(numeric.notna().sum()) == present:
+            columns[name] = numeric
+            continue
+        flags = text.str.lower().map(_CSV_BOOLS)
+        if int(flags.notna().sum()) == present:
+            columns[name] = flags.astype(bool) if present == len(text) else flags.astype(object)
+        else:
+            columns[name] = text
+    return pd.DataFrame(columns, index=raw_chunk.index)
+
+
+def _read_chunks(file_path, chunk_size):
+    """
+    Yield (typed, raw) DataFrame pairs for the same rows of a CSV.
+
+    Each chunk is parsed once as text. raw holds every field as its CSV
+    text and is what rows are hashed and keyed on, so editing one cell
+    never changes the hash of other rows through a column's inferred dtype;
+    typed is derived from it (see _typed) and is what gets stored.
+    """
+    for raw in pd.read_csv(file_path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+        yield _typed(raw), raw
+
+
+def ingest_csv_stream(
+    file_path,
+    chunk_size=INGEST_CHUNK_SIZE,
+    quality_score=0.85,
+    storage=INGEST_STORAGE,
+    key_column=None,
+    force=False,
+):
+    """
+    Idempotently stream a CSV into the unified store in bounded chunks.
+
+    A file whose content fingerprint already has a completed manifest for
+    this source is skipped unless force=True. Otherwise rows are upserted
+    on (source_id, row key): the key_column value, or the row's content hash
+    when no key is given (so duplicate rows are stored once). Existing rows
+    are rewritten only if their content hash changed, so re-running after a
+    partial failure never duplicates data. The file is the whole source:
+    once every chunk is written, rows whose key is no longer in the file
+    (removed rows, and without key_column the old version of an edited
+    row) are deleted. Each run is recorded in ingestion_manifests; a
+    manifest only skips re-ingesting into the same storage.
+
+    storage="json" writes one JSON row per record to unified_data: each
+    chunk is serialized in one vectorized call and written with executemany
+    inside one transaction per chunk. storage="columnar" writes to a typed
+    per-source table registered in source_catalog (see tools/columnar_store.py).
+    Returns ingestion stats.
+    """
+    if storage not in ("json", "columnar"):
+        raise ValueError(f"Unknown storage: {storage}")
+    started = time.perf_counter()
+    fingerprint = file_fingerprint(file_path)
+
+    previous = None if force else _completed_manifest(file_path, fingerprint, storage)
+    if previous is not None:
+        stats = {
+            "source_id": file_path,
+            "storage": storage,
+            "skipped": True,
+            "manifest_id": previous["id"],
+            "previously_ingested_at": previous["finished_at"],
+            "rows": 0,
+        }
+        logger.info("CSV already ingested, skipping", extra=stats)
+        return stats
+
+    with transaction() as conn:
+        manifest_id = conn.execute(
+            """
+            INSERT INTO ingestion_manifests (
+                source_id, file_fingerprint, file_size, storage, key_column, status, started_at
+            )
+            VALUES (?, ?, ?, ?, ?, 'started', ?)
+            """,
+            (
+                file_path,
+                fingerprint,
+                os.path.getsize(file_path),
+                storage,
+                key_column,
+                datetime.utcnow().isoformat(),
+            ),
+        ).lastrowid
+
+    rows_before = _source_row_count(file_path, storage)
+    rows = 0
+    written = 0
+    chunks = 0
+    # Keys seen in this file, on this thread's pooled connection
+    keys_table = f"temp.ingest_keys_{manifest_id}"
+    get_connection().execute(f"CREATE TABLE IF NOT EXISTS {keys_table} (row_key TEXT PRIMARY KEY)")
+    try:
+        for chunk, raw_chunk in _read_chunks(file_path, chunk_size):
+            hashes = row_hashes(raw_chunk)
+            keys = _row_keys(raw_chunk, key_column, hashes)
+            digests = [f"{h:016x}" for h in hashes.tolist()]
+            if storage == "columnar":
+                written += columnar_store.write_chunk(file_path, chunk, keys, digests, quality_score)
+                with transaction() as conn:
+                    _record_keys(conn, keys_table, keys)
+            else:
+                payloads = chunk.to_json(orient="records", lines=True).splitlines()
+                with transaction() as conn:  # one transaction per chunk
+                    written += conn.executemany(
+                        UPSERT_UNIFIED_SQL,
+                        (
+                            (file_path, "csv", payload, quality_score, digest, key)
+                            for payload, digest, key in zip(payloads, digests, keys)
+                        ),
+                    ).rowcount
+                    _record_keys(conn, keys_table, keys)
+            rows += len(chunk)
+            chunks += 1
+        deleted = _delete_missing_rows(file_path, storage, keys_table)
+    except Exception as e:
+        with transaction() as conn:
+            conn.execute(
+                """
+                UPDATE ingestion_manifests
+                SET status = 'failed', rows_read = ?, error = ?, finished_at = ?
+                WHERE id = ?
+                """,
+                (rows, repr(e), datetime.utcnow().isoformat(), manifest_id),
+            )
+        raise
+    finally:
+        get_connection().execute(f"DROP TABLE IF EXISTS {keys_table}")
+
+    inserted = _source_row_count(file_path, storage) - rows_before + deleted
+    updated = written - inserted
+    with transaction() as conn:
         conn.execute(
-            "INSERT INTO unified_data (source_id, data_type, raw_data, quality_score) VALUES (?, ?, ?, ?)",
-            (file_path, 'csv', json.dumps(row.to_dict()), 0.85)
+            """
+            UPDATE ingestion_manifests
+            SET status = 'completed', rows_read = ?, rows_inserted = ?, rows_updated = ?,
+                rows_unchanged = ?, rows_deleted = ?, finished_at = ?
+            WHERE id = ?
+            """,
+            (
+                rows,
+                inserted,
+                updated,
+                rows - written,
+                deleted,
+                datetime.utcnow().isoformat(),
+                manifest_id,
+            ),
         )
-    conn.commit()
-    conn.close()
-    return f"Ingested {len(df)} records from {file_path}"
-
-def query_unified_store(query):
-    """Query unified data store"""
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df.to_dict('records')
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "source_id": file_path,
+        "storage": storage,
+        "skipped": False,
+        "manifest_id": manifest_id,
+        "rows": rows,
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": rows - written,
+        "deleted": deleted,
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    logger.info("CSV ingested", extra=stats)
+    return stats
+
+
+def ingest_csv(file_path, chunk_size=INGEST_CHUNK_SIZE, storage=INGEST_STORAGE, key_column=None):
+    """Ingest CSV data into unified store"""
+    stats = ingest_csv_stream(
+        file_path, chunk_size=chunk_size, storage=storage, key_column=key_column
+    )
+    if stats["skipped"]:
+        return f"Skipped {file_path}: already ingested (manifest {stats['manifest_id']})"
+    return (
+        f"Ingested {stats['rows']} records from {file_path} "
+        f"({stats['inserted']} new, {stats['updated']} updated, {stats['unchanged']} unchanged, "
+        f"{stats['deleted']} removed)"
+    )
+
+
+def _read_only(action, *args):
+    return sqlite3.SQLITE_OK if action in _READ_ACTIONS else sqlite3.SQLITE_DENY
+
+
+@contextmanager
+def _guarded(conn, timeout_s):
+    """Run statements on conn read-only and abort them after timeout_s seconds."""
+    conn.set_authorizer(_read_only)
+    if timeout_s is not None:
+        deadline = time.monotonic() + timeout_s
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, _PROGRESS_STEPS)
+    try:
+        yield conn
+    except sqlite3.OperationalError as e:
+        if "interrupted" in str(e):
+            raise TimeoutError(f"Query exceeded its {timeout_s}s budget") from e
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+        conn.set_authorizer(None)
+
+
+def query_unified_store(query, params=(), max_rows=QUERY_MAX_ROWS, timeout_s=QUERY_TIMEOUT_S):
+    """
+    Run a read-only SQL query against the unified store.
+
+    Values must be passed as params (qmark or named placeholders), never
+    formatted into the query. Statements that write are rejected. At most
+    max_rows rows are returned (extra rows are dropped with a warning) and
+    the query is interrupted with TimeoutError after timeout_s seconds.
+    """
+    conn = get_connection()
+    with _guarded(conn, timeout_s):
+        cur = conn.execute(query, params)
+        try:
+            rows = cur.fetchmany(max_rows + 1) if max_rows is not None else cur.fetchall()
+        finally:
+            cur.close()
+    if max_rows is not None and len(rows) > max_rows:
+        logger.warning("Query result truncated to %s rows", max_rows)
+        rows = rows[:max_rows]
+    return [dict(row) for row in rows]
+
+
+def _projection(columns):
+    columns = list(DEFAULT_UNIFIED_COLUMNS if columns is None else columns)
+    unknown = [c for c in columns if c not in UNIFIED_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown unified_data columns: {unknown}")
+    if "id" not in columns:
+        columns.insert(0, "id")  # the page cursor
+    return columns
+
+
+def fetch_unified_page(
+    after_id=0,
+    limit=QUERY_PAGE_SIZE,
+    source_id=None,
+    data_type=None,
+    columns=None,
+    timeout_s=QUERY_TIMEOUT_S,
+):
+    """
+    Return one keyset page of unified_data rows with id > after_id.
+
+    Only the requested columns are read; raw_data and cleaned_data must be
+    asked for explicitly. Returns {"rows": [...], "next_cursor": id or None};
+    pass next_cursor back as after_id for the following page.
+    """
+    columns = _projection(columns)
+    where, params = ["id > ?"], [after_id]
+    if source_id is not None:
+        where.append("source_id = ?")
+        params.append(source_id)
+    if data_type is not None:
+        where.append("data_type = ?")
+        params.append(data_type)
+    sql = (
+        f"SELECT {', '.join(columns)} FROM unified_data "
+        f"WHERE {' AND '.join(where)} ORDER BY id LIMIT ?"
+    )
+    params.append(limit)
+
+    rows = query_unified_store(sql, params, max_rows=None, timeout_s=timeout_s)
+    next_cursor = rows[-1]["id"] if len(rows) == limit else None
+    return {"rows": rows, "next_cursor": next_cursor}
+
+
+def iter_unified_pages(
+    source_id=None,
+    data_type=None,
+    columns=None,
+    page_size=QUERY_PAGE_SIZE,
+    after_id=0,
+    max_rows=None,
+    timeout_s=None,
+):
+    """
+    Stream unified_data rows as lists of at most page_size dicts.
+
+    Pages are fetched lazily by keyset (id > last id), so memory is bounded
+    by one page however large the source is. Iteration stops after max_rows
+    rows; timeout_s bounds the total time spent in the database across pages
+    (time the caller spends between pages is not counted) and is enforced
+    with TimeoutError.
+    """
+    remaining_rows = max_rows
+    remaining_s = timeout_s
+    cursor = after_id
+    while cursor is not None and (remaining_rows is None or remaining_rows > 0):
+        if remaining_s is not None and remaining_s <= 0:
+            raise TimeoutError(f"Paged query exceeded its {timeout_s}s budget")
+        limit = page_size if remaining_rows is None else min(page_size, remaining_rows)
+        started = time.monotonic()
+        page = fetch_unified_page(cursor, limit, source_id, data_type, columns, remaining_s)
+        if remaining_s is not None:
+            remaining_s -= time.monotonic() - started
+        if remaining_rows is not None:
+            remaining_rows -= len(page["rows"])
+        if page["rows"]:
+            yield page["rows"]
+        cursor = page["next_cursor"]
+
+
+def scan_source(source_id, columns=None, filters=None, page_size=QUERY_PAGE_SIZE):
+    """
+    Stream a source as DataFrame pages holding only the requested columns.
+
+    Columnar sources are read from their typed table, so values come back
+    with native types and no JSON decoding; filters ({column: value}) are
+    pushed down as equality predicates. JSON sources fall back to decoding
+    unified_data.raw_data and filtering in pandas.
+    """
+    entry = columnar_store.get_catalog_entry(source_id)
+    if entry is None or entry["storage"] != "columnar":
+        for page in iter_unified_pages(source_id=source_id, columns=("raw_data",), page_size=page_size):
+            frame = pd.DataFrame([json.loads(row["raw_data"]) for row in page])
+            for column, value in (filters or {}).items():
+                frame = frame[frame[column] == value]
+            yield frame if columns is None else frame.reindex(columns=list(columns))
+        return
+
+    columns = list(entry["schema"]) if columns is None else list(columns)
+    unknown = [c for c in list(columns) + list(filters or {}) if c not in entry["schema"]]
+    if unknown:
+        raise ValueError(f"Unknown columns for {source_id}: {unknown}")
+
+    quote = columnar_store.quote
+    where = ["rowid > ?"] + [f"{quote(c)} = ?" for c in filters or {}]
+    sql = (
+        f"SELECT rowid, {', '.join(quote(c) for c in columns)} FROM {quote(entry['table_name'])} "
+        f"WHERE {' AND '.join(where)} ORDER BY rowid LIMIT ?"
+    )
+    last = 0
+    conn = get_connection()
+    while True:
+        rows = conn.execute(sql, [last, *(filters or {}).values(), page_size]).fetchall()
+        if not rows:
+            return
+        last = rows[-1][0]
+        yield pd.DataFrame.from_records([tuple(row)[1:] for row in rows], columns=columns)
+        if len(rows) < page_size:
+            return
+
+
+def source_exists(source_id):
+    """True if source_id is in source_catalog or has rows in unified_data."""
+    if columnar_store.get_catalog_entry(source_id) is not None:
+        return True
+    row = get_connection().execute(
+        "SELECT 1 FROM unified_data WHERE source_id = ? LIMIT 1", (source_id,)
+    ).fetchone()
+    return row is not None
+
+
+def load_source_frame(source_id):
+    """Load all rows of one source as a DataFrame (columnar or unified_data JSON)."""
+    frames = list(scan_source(source_id, page_size=INGEST_CHUNK_SIZE))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
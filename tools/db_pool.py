@@ -0,0 +1,189 @@
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from config import (
+    DB_PATH,
+    DB_SYNCHRONOUS,
+    DB_CACHE_SIZE_KB,
+    DB_MMAP_SIZE,
+    DB_BUSY_TIMEOUT_MS,
+    logger,
+)
+
+
+class ConnectionPool:
+    """
+    Long-lived SQLite connections, one per thread, shared by all DB helpers.
+
+    Connections are opened lazily on first use in a thread and reused for
+    every later call from that thread. A connection is closed when its
+    thread object is garbage collected, and connections left by threads
+    that have exited are swept whenever a new one is opened, so short-lived
+    worker threads do not leak SQLite handles. Each connection runs in autocommit
+    mode with WAL journaling; writes go through transaction(), which takes
+    the writer lock up front (BEGIN IMMEDIATE) so readers are never blocked
+    and concurrent writers queue instead of failing on lock upgrades.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # thread ident -> connection
+        self._pid = os.getpid()
+        self._metrics = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "reuses": 0,
+            "transactions": 0,
+            "rollbacks": 0,
+            "write_wait_ms_total": 0.0,
+            "write_wait_ms_max": 0.0,
+        }
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        ident = threading.get_ident()
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked child: the inherited connections belong to the parent
+                self._connections = {}
+                self._pid = os.getpid()
+            alive = {thread.ident for thread in threading.enumerate()}
+            stale = [
+                (i, c) for i, c in self._connections.items() if i == ident or i not in alive
+            ]
+            for i, _ in stale:
+                del self._connections[i]
+            self._metrics["connections_opened"] += 1
+            self._connections[ident] = conn
+        for _, stale_conn in stale:
+            self._close(stale_conn)
+        weakref.finalize(threading.current_thread(), self._release, ident, conn)
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            logger.exception("Failed to close pooled connection")
+        with self._lock:
+            self._metrics["connections_closed"] += 1
+
+    def _release(self, ident, conn):
+        """Drop and close a finished thread's connection (unless already swept)."""
+        with self._lock:
+            if self._connections.get(ident) is not conn:
+                return
+            del self._connections[ident]
+        self._close(conn)
+
+    def connection(self):
+        """Return this thread's connection, opening it on first use. Do not close()."""
+        conn = getattr(self._local, "conn", None)
+        # A forked worker must not reuse the parent's connection
+        if conn is not None and self._local.pid == os.getpid():
+            with self._lock:
+                self._metrics["checkouts"] += 1
+                self._metrics["reuses"] += 1
+            return conn
+
+        conn = self._open()
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        with self._lock:
+            self._metrics["checkouts"] += 1
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Yield this thread's connection inside a write transaction."""
+        conn = self.connection()
+        if conn.in_transaction:
+            # Nested use joins the outer transaction
+            yield conn
+            return
+
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._metrics["transactions"] += 1
+            self._metrics["write_wait_ms_total"] += waited_ms
+            self._metrics["write_wait_ms_max"] = max(
+                self._metrics["write_wait_ms_max"], waited_ms
+            )
+
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            with self._lock:
+                self._metrics["rollbacks"] += 1
+            raise
+        else:
+            conn.commit()
+
+    def stats(self):
+        """Return a snapshot of pool metrics."""
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["connections_open"] = len(self._connections)
+        stats["db_path"] = self.db_path
+        stats["write_wait_ms_total"] = round(stats["write_wait_ms_total"], 3)
+        stats["write_wait_ms_max"] = round(stats["write_wait_ms_max"], 3)
+        return stats
+
+    def close_all(self):
+        """Close every pooled connection (e.g. at shutdown or in tests)."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            self._close(conn)
+        self._local = threading.local()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=None):
+    """Return the shared pool for db_path (defaults to config.DB_PATH)."""
+    db_path = db_path or DB_PATH
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = _pools[db_path] = ConnectionPool(db_path)
+        return pool
+
+
+def get_connection():
+    """Return the calling thread's pooled connection."""
+    return get_pool().connection()
+
+
+def transaction():
+    """Context manager for a write transaction on the shared pool."""
+    return get_pool().transaction()
+
+
+def pool_stats():
+    """Return metrics for the shared pool."""
+    return get_pool().stats()
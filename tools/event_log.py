@@ -0,0 +1,174 @@
+import atexit
+import json
+import os
+import threading
+from collections import deque
+
+from config import (
+    EVENT_LOG_PATH,
+    EVENT_LOG_BUFFER,
+    EVENT_LOG_BATCH,
+    EVENT_LOG_FLUSH_S,
+    EVENT_LOG_MAX_BYTES,
+    EVENT_LOG_BACKUPS,
+    logger,
+)
+
+
+class EventLogSink:
+    """
+    Buffered JSONL event log with a background writer thread.
+
+    emit() serializes the event and appends it to an in-memory ring buffer;
+    the writer drains the buffer in batches when batch_size events are queued
+    or flush_interval_s has passed, appending to one open file handle. When
+    the buffer is full the oldest event is dropped and counted. Files rotate
+    to path.1 .. path.N once they exceed max_bytes.
+    """
+
+    def __init__(
+        self,
+        path=EVENT_LOG_PATH,
+        capacity=EVENT_LOG_BUFFER,
+        batch_size=EVENT_LOG_BATCH,
+        flush_interval_s=EVENT_LOG_FLUSH_S,
+        max_bytes=EVENT_LOG_MAX_BYTES,
+        backup_count=EVENT_LOG_BACKUPS,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        self._buffer = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._file = None
+        self._thread = None
+        self._closed = False
+        self._stats = {"emitted": 0, "written": 0, "dropped": 0, "flushes": 0, "rotations": 0}
+        atexit.register(self.close)
+
+    def _ensure_writer(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="event-log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def emit(self, event):
+        """Queue one event dict; never blocks on file I/O."""
+        line = json.dumps(event, default=str)
+        with self._cond:
+            if self._closed:
+                self._stats["dropped"] += 1
+                return
+            if len(self._buffer) == self._buffer.maxlen:
+                self._stats["dropped"] += 1  # deque evicts the oldest line
+            self._buffer.append(line)
+            self._stats["emitted"] += 1
+            self._ensure_writer()
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def _drain(self):
+        with self._cond:
+            lines = list(self._buffer)
+            self._buffer.clear()
+        return lines
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._stats["rotations"] += 1
+
+    def _write(self, lines):
+        """Append lines to the file; the caller holds _write_lock."""
+        if not lines:
+            return
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        self._stats["written"] += len(lines)
+        self._stats["flushes"] += 1
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _drain_and_write(self):
+        # One lock around both steps: a batch drained later can never be
+        # written before an earlier one, so the file keeps emit() order
+        with self._write_lock:
+            self._write(self._drain())
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or len(self._buffer) >= self.batch_size,
+                    timeout=self.flush_interval_s,
+                )
+                closed = self._closed
+            try:
+                self._drain_and_write()
+            except Exception:
+                logger.exception("Event log write failed")
+            if closed:
+                return
+
+    def flush(self):
+        """Write all buffered events now (synchronously)."""
+        self._drain_and_write()
+
+    def close(self):
+        """Stop the writer thread after flushing everything; safe to call twice."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["buffered"] = len(self._buffer)
+        return stats
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_event_log():
+    """Return the process-wide event log sink, created on first use."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = EventLogSink()
+    return _sink
+
+
+def flush_event_log(path=None):
+    """Write out buffered events of the process-wide sink, if one exists (and writes to path)."""
+    sink = _sink
+    if sink is None:
+        return
+    if path is None or os.path.abspath(path) == os.path.abspath(sink.path):
+        sink.flush()
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from tools.data_layer import get_quality_partitions, save_data_quality_run
+from tools.profiler import DatasetProfile, row_hashes
+from tools.sketches import hash_values
+
+# Rows per partition in "rows" mode and per read chunk in "hash" mode
+PARTITION_ROWS = 50_000
+# Buckets in "hash" mode
+HASH_PARTITIONS = 64
+
+
+def _read_chunks(source, chunksize):
+    """Yield DataFrame chunks from a CSV path, file object or DataFrame."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start : start + chunksize]
+        return
+    if hasattr(source, "seek"):
+        source.seek(0)
+    yield from pd.read_csv(source, chunksize=chunksize)
+
+
+def _profile_json(profile):
+    return json.dumps(profile.to_dict())
+
+
+def _row_range_partitions(source, previous, partition_rows, schema, stats, all_hashes):
+    """
+    One pass: fingerprint each row range and profile it only if it changed.
+
+    The row hashes of every range are appended to all_hashes so duplicates
+    that fall in different ranges can still be counted.
+    """
+    for index, chunk in enumerate(_read_chunks(source, partition_rows)):
+        key = f"rows:{index}"
+        hashes = row_hashes(chunk)
+        all_hashes.append(hashes)
+        fingerprint = hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+        stored = previous.get(key)
+        if stored is not None and stored["fingerprint"] == fingerprint:
+            stats["reused"] += 1
+            profile_json = stored["profile_json"]
+            profile = DatasetProfile.from_dict(json.loads(profile_json))
+        else:
+            stats["profiled"] += 1
+            profile = DatasetProfile(schema).update(chunk)
+            profile_json = _profile_json(profile)
+        yield key, fingerprint, profile, profile_json
+
+
+def _bucket_of(chunk, key_column, hashes, n_partitions):
+    keys = hash_values(chunk[key_column]) if key_column else hashes
+    return (keys % np.uint64(n_partitions)).astype(np.int64)
+
+
+def _hash_partitions(source, previous, key_column, n_partitions, schema, stats):
+    """
+    Two passes over the source.
+
+    Pass one only hashes rows into buckets and builds an order-independent
+    fingerprint per bucket (row count, sum and xor of row hashes). Pass two
+    profiles just the rows of buckets whose fingerprint changed.
+    """
+    counts = np.zeros(n_partitions, dtype=np.int64)
+    sums = np.zeros(n_partitions, dtype=np.uint64)
+    xors = np.zeros(n_partitions, dtype=np.uint64)
+    for chunk in _read_chunks(source, PARTITION_ROWS):
+        hashes = row_hashes(chunk)
+        bucket = _bucket_of(chunk, key_column, hashes, n_partitions)
+        counts += np.bincount(bucket, minlength=n_partitions)
+        np.add.at(sums, bucket, hashes)
+        np.bitwise_xor.at(xors, bucket, hashes)
+
+    fingerprints = {
+        f"hash:{b}": f"{counts[b]}-{int(sums[b]):016x}-{int(xors[b]):016x}"
+        for b in range(n_partitions)
+        if counts[b]
+    }
+    changed = {
+        key
+        for key, fingerprint in fingerprints.items()
+        if previous.get(key, {}).get("fingerprint") != fingerprint
+    }
+
+    fresh = {key: DatasetProfile(schema) for key in changed}
+    if changed:
+        changed_ids = np.array(sorted(int(key.split(":")[1]) for key in changed))
+        for chunk in _read_chunks(source, PARTITION_ROWS):
+            bucket = _bucket_of(chunk, key_column, row_hashes(chunk), n_partitions)
+            for b in np.intersect1d(np.unique(bucket), changed_ids):
+                fresh[f"hash:{b}"].update(chunk[bucket == b])
+
+    for key, fingerprint in fingerprints.items():
+        if key in fresh:
+            stats["profiled"] += 1
+            profile = fresh[key]
+            profile_json = _profile_json(profile)
+        else:
+            stats["reused"] += 1
+            profile_json = previous[key]["profile_json"]
+            profile = DatasetProfile.from_dict(json.loads(profile_json))
+        yield key, fingerprint, profile, profile_json
+
+
+def run_incremental_quality(
+    source,
+    dataset_name,
+    uploaded_by="demo_user",
+    mode="rows",
+    key_column=None,
+    partition_rows=PARTITION_ROWS,
+    n_partitions=HASH_PARTITIONS,
+    schema=None,
+):
+    """
+    Profile a dataset, re-profiling only partitions whose fingerprint changed.
+
+    mode="rows" splits the source into fixed row ranges (cheap, single pass;
+    best for append-mostly extracts). mode="hash" buckets rows by the hash of
+    key_column (or of the whole row), which keeps partitions stable when rows
+    are inserted or reordered. Duplicate rows are counted across the whole
+    dataset in both modes (rows mode keeps 8 bytes per row for it). Partition
+    fingerprints and profiles are stored with the run for the next upload.
+    Returns the quality summary with an "incremental" section.
+    """
+    started = time.perf_counter()
+    previous = get_quality_partitions(dataset_name)
+    stats = {"mode": mode, "reused": 0, "profiled": 0}
+    all_hashes = []
+
+    if mode == "rows":
+        parts = _row_range_partitions(source, previous, partition_rows, schema, stats, all_hashes)
+    elif mode == "hash":
+        parts = _hash_partitions(source, previous, key_column, n_partitions, schema, stats)
+    else:
+        raise ValueError(f"Unknown partition mode: {mode}")
+
+    total = DatasetProfile(schema)
+    partitions = []
+    for key, fingerprint, profile, profile_json in parts:
+        total.merge(profile)
+        partitions.append(
+            {
+                "partition_key": key,
+                "fingerprint": fingerprint,
+                "row_count": profile.rows,
+                "profile_json": profile_json,
+            }
+        )
+
+    if mode == "rows":
+        # Row ranges can split a duplicate pair; count duplicates over all rows
+        total.use_row_hashes(all_hashes)
+    summary = total.summary()
+    stats["partitions"] = len(partitions)
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    summary["incremental"] = stats
+
+    summary["run_id"] = save_data_quality_run(
+        dataset_name=dataset_name,
+        uploaded_by=uploaded_by,
+        row_count=summary["row_count"],
+        issue_count=summary["issue_count"],
+        score=summary["score"],
+        result=summary,
+        partitions=partitions,
+    )
+    return summary
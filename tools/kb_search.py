@@ -0,0 +1,268 @@
+import csv
+import math
+import os
+import re
+import threading
+
+import numpy as np
+
+from config import logger
+
+KB_ARTICLES_PATH = "data/kb_articles.csv"
+KB_FIELDS = ["article_id", "title", "keywords", "answer"]
+
+# Confidence band reported by search_kb: no keyword coverage -> floor,
+# a full keyword-phrase match -> ceiling.
+CONFIDENCE_FLOOR = 0.3
+CONFIDENCE_CEILING = 0.95
+# A keyword phrase needs this many content tokens to be matched on content
+# alone; shorter ones ("where is my order" -> {order}) are matched on all of
+# their tokens, and a one-token phrase can never give full coverage.
+MIN_PHRASE_TOKENS = 2
+SHORT_PHRASE_MAX_COVERAGE = 0.5
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in is it "
+    "me my no not of on or our so that the this to was we what when where why "
+    "will with you your".split()
+)
+_SUFFIXES = ("ing", "es", "ed", "s")
+
+
+def _stem(token):
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)]
+    return token
+
+
+def tokenize(text, keep_stopwords=False):
+    """Lowercase, drop stopwords (unless keep_stopwords) and strip common suffixes."""
+    return [
+        _stem(tok)
+        for tok in _TOKEN_RE.findall((text or "").lower())
+        if keep_stopwords or tok not in _STOPWORDS
+    ]
+
+
+class KBIndex:
+    """
+    BM25 index over one version of the article list.
+
+    Postings are kept per term as (doc ids, term frequencies) and turned into
+    NumPy arrays on first query. Readers only ever see a fully built index:
+    KnowledgeBase builds a new one (or a copy) and swaps the reference.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.articles = []
+        self._phrases = []  # per doc: list of (content tokens, all tokens) per keyword phrase
+        self._postings = {}  # term -> ([doc ids], [tf])
+        self._owned = set()  # terms whose posting lists this index may append to
+        self._arrays = {}  # term -> (ids ndarray, tf ndarray)
+        self._doc_len = []
+        self._doc_len_arr = None
+        self._total_len = 0
+
+    def copy(self):
+        """
+        Copy for copy-on-write updates.
+
+        Posting lists and term arrays are shared with this index; add()
+        copies a term's posting list the first time the copy appends to it,
+        so adding a document costs the lists of its own terms, not the
+        whole index.
+        """
+        other = KBIndex(self.k1, self.b)
+        other.articles = list(self.articles)
+        other._phrases = list(self._phrases)
+        other._postings = dict(self._postings)
+        other._arrays = dict(self._arrays)
+        other._doc_len = list(self._doc_len)
+        other._total_len = self._total_len
+        return other
+
+    def add(self, article):
+        doc_id = len(self.articles)
+        keywords = [k.strip() for k in (article.get("keywords") or "").split(";") if k.strip()]
+        tokens = tokenize(" ".join([article.get("title", ""), " ".join(keywords), article.get("answer", "")]))
+
+        tf = {}
+        for tok in tokens:
+            tf[tok] = tf.get(tok, 0) + 1
+        for term, count in tf.items():
+            if term not in self._owned:
+                ids, tfs = self._postings.get(term, ((), ()))
+                self._postings[term] = (list(ids), list(tfs))
+                self._owned.add(term)
+            ids, tfs = self._postings[term]
+            ids.append(doc_id)
+            tfs.append(count)
+            self._arrays.pop(term, None)
+
+        self.articles.append(article)
+        self._phrases.append(
+            [
+                (set(tokenize(k)), set(tokenize(k, keep_stopwords=True)))
+                for k in keywords + [article.get("title", "")]
+            ]
+        )
+        self._doc_len.append(len(tokens))
+        self._doc_len_arr = None
+        self._total_len += len(tokens)
+
+    def _term_arrays(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            ids, tfs = self._postings[term]
+            arrays = (np.asarray(ids, dtype=np.int64), np.asarray(tfs, dtype=np.float64))
+            self._arrays[term] = arrays
+        return arrays
+
+    def search(self, query, top_k=3):
+        """Return up to top_k (doc_id, bm25 score) pairs, best first."""
+        n_docs = len(self.articles)
+        terms = {t for t in tokenize(query) if t in self._postings}
+        if not n_docs or not terms:
+            return []
+
+        if self._doc_len_arr is None:
+            self._doc_len_arr = np.asarray(self._doc_len, dtype=np.float64)
+        avgdl = self._total_len / n_docs or 1.0
+        norm = self.k1 * (1 - self.b + self.b * self._doc_len_arr / avgdl)
+
+        scores = np.zeros(n_docs)
+        for term in terms:
+            ids, tfs = self._term_arrays(term)
+            idf = math.log(1 + (n_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + norm[ids])
+
+        k = min(top_k, n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+    def keyword_coverage(self, doc_id, query):
+        """
+        Best fraction of any keyword phrase of doc_id whose tokens appear in query.
+
+        Phrases with fewer than MIN_PHRASE_TOKENS content tokens are matched
+        on their stopwords too, and single-token phrases are capped at
+        SHORT_PHRASE_MAX_COVERAGE, so one shared word ("order", "receipt")
+        cannot claim a full match.
+        """
+        query_terms = set(tokenize(query))
+        query_all = set(tokenize(query, keep_stopwords=True))
+        best = 0.0
+        for content, full in self._phrases[doc_id]:
+            if len(content) >= MIN_PHRASE_TOKENS:
+                coverage = len(content & query_terms) / len(content)
+            elif len(full) >= MIN_PHRASE_TOKENS:
+                coverage = len(full & query_all) / len(full)
+            elif full:
+                coverage = min(SHORT_PHRASE_MAX_COVERAGE, len(full & query_all) / len(full))
+            else:
+                continue
+            best = max(best, coverage)
+        return best
+
+
+class KnowledgeBase:
+    """
+    BM25 index over KB articles with incremental updates.
+
+    The article file is re-indexed when its mtime or size changes. Rebuilds
+    and added articles produce a new KBIndex that replaces the current one
+    in a single assignment, so concurrent searches never see a half-built
+    index. Callers that make several lookups for one query should take one
+    snapshot() and use it throughout.
+    """
+
+    def __init__(self, path=KB_ARTICLES_PATH, k1=1.2, b=0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._signature = None
+        self._loaded = False
+        self._current = KBIndex(k1, b)
+
+    @property
+    def articles(self):
+        return self._current.articles
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def refresh(self, force=False):
+        """Rebuild the index if the article file changed."""
+        signature = self._file_signature()
+        if not force and self._loaded and signature == self._signature:
+            return
+        with self._lock:
+            if not (force or not self._loaded or signature != self._signature):
+                return
+            index = KBIndex(self.k1, self.b)
+            if signature is not None:
+                with open(self.path, newline="", encoding="utf-8-sig") as f:
+                    for row in csv.DictReader(f):
+                        index.add(row)
+            else:
+                logger.warning("KB article file not found: %s", self.path)
+            self._current = index
+            self._signature = signature
+            self._loaded = True
+            logger.info("Indexed %d KB articles from %s", len(index.articles), self.path)
+
+    def snapshot(self):
+        """The current index (refreshed if the file changed); stays consistent while held."""
+        self.refresh()
+        return self._current
+
+    def add_article(self, article, persist=True):
+        """Index one article incrementally; optionally append it to the article file."""
+        self.refresh()
+        article = {field: article.get(field, "") for field in KB_FIELDS}
+        with self._lock:
+            index = self._current.copy()
+            if not article["article_id"]:
+                article["article_id"] = f"KB{len(index.articles) + 1:03d}"
+            if persist:
+                new_file = not os.path.exists(self.path)
+                with open(self.path, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=KB_FIELDS)
+                    if new_file:
+                        writer.writeheader()
+                    writer.writerow(article)
+                self._signature = self._file_signature()
+            index.add(article)
+            self._current = index
+        return article["article_id"]
+
+    def search(self, query, top_k=3):
+        """Return up to top_k (doc_id, bm25 score) pairs, best first."""
+        return self.snapshot().search(query, top_k)
+
+    def keyword_coverage(self, doc_id, query):
+        return self.snapshot().keyword_coverage(doc_id, query)
+
+
+_kb = None
+_kb_lock = threading.Lock()
+
+
+def get_knowledge_base():
+    """Return the process-wide knowledge base, indexed on first use."""
+    global _kb
+    if _kb is None:
+        with _kb_lock:
+            if _kb is None:
+                _kb = KnowledgeBase()
+    return _kb
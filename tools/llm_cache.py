@@ -0,0 +1,175 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from config import LLM_CACHE_DB, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTLS, logger
+from tools.db_pool import get_pool
+
+# Every PURGE_EVERY disk writes, delete up to PURGE_BATCH expired rows, so
+# the table stays bounded by live entries without long write transactions
+PURGE_EVERY = 64
+PURGE_BATCH = 1000
+
+
+def cache_key(model_name, prompt, generation_config=None):
+    """Content address for a request: sha256 over model, prompt and params."""
+    payload = json.dumps([model_name, prompt, generation_config or {}], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def ttl_for(agent):
+    return LLM_CACHE_TTLS.get(agent, LLM_CACHE_TTLS.get("default", 0))
+
+
+class ResponseCache:
+    """
+    LRU cache of LLM response texts with per-entry expiry.
+
+    Entries live in an in-memory OrderedDict bounded to max_entries. When
+    db_path is set, entries are also written to a SQLite table so they
+    survive restarts; a memory miss falls back to disk and promotes the hit.
+    Expired disk rows are purged in bounded batches as new entries are
+    written.
+    """
+
+    def __init__(self, max_entries=LLM_CACHE_MAX_ENTRIES, db_path=LLM_CACHE_DB):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()  # key -> (expires_at, text)
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._evictions = 0
+        self._disk_writes = 0
+        self._purged = 0
+        if db_path:
+            with get_pool(db_path).transaction() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        key TEXT PRIMARY KEY,
+                        agent TEXT,
+                        text TEXT,
+                        expires_at REAL
+                    )
+                    """
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires_at)"
+                )
+                self._purge_expired(conn)
+
+    def _purge_expired(self, conn):
+        """Delete at most PURGE_BATCH expired disk rows."""
+        deleted = conn.execute(
+            "DELETE FROM llm_cache WHERE key IN "
+            "(SELECT key FROM llm_cache WHERE expires_at <= ? LIMIT ?)",
+            (time.time(), PURGE_BATCH),
+        ).rowcount
+        with self._lock:
+            self._purged += deleted
+
+    def _count(self, agent, field):
+        s = self._stats.setdefault(agent, {"hits": 0, "disk_hits": 0, "misses": 0})
+        s[field] += 1
+
+    def _remember(self, key, expires_at, text):
+        self._entries[key] = (expires_at, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def get(self, key, agent="default"):
+        """Return the cached text for key, or None on a miss or expiry."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._count(agent, "hits")
+                    return entry[1]
+                del self._entries[key]
+
+        if self.db_path:
+            row = (
+                get_pool(self.db_path)
+                .connection()
+                .execute("SELECT text, expires_at FROM llm_cache WHERE key = ?", (key,))
+                .fetchone()
+            )
+            if row is not None and row["expires_at"] > now:
+                with self._lock:
+                    self._remember(key, row["expires_at"], row["text"])
+                    self._count(agent, "disk_hits")
+                return row["text"]
+
+        with self._lock:
+            self._count(agent, "misses")
+        return None
+
+    def put(self, key, text, ttl, agent="default"):
+        """Store text under key for ttl seconds (no-op for ttl <= 0 or empty text)."""
+        if ttl <= 0 or text is None:
+            return
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(key, expires_at, text)
+        if self.db_path:
+            try:
+                with self._lock:
+                    self._disk_writes += 1
+                    purge = self._disk_writes % PURGE_EVERY == 0
+                with get_pool(self.db_path).transaction() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, agent, text, expires_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, agent, text, expires_at),
+                    )
+                    if purge:
+                        self._purge_expired(conn)
+            except Exception:
+                # The in-memory copy is still valid; persistence is best-effort
+                logger.exception("Failed to persist LLM cache entry")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            with get_pool(self.db_path).transaction() as conn:
+                conn.execute("DELETE FROM llm_cache")
+
+    def stats(self):
+        """Hit/miss counts per agent plus cache size and evictions."""
+        with self._lock:
+            per_agent = {agent: dict(s) for agent, s in self._stats.items()}
+            size = len(self._entries)
+            evictions = self._evictions
+            purged = self._purged
+        for s in per_agent.values():
+            lookups = s["hits"] + s["disk_hits"] + s["misses"]
+            s["hit_rate"] = round((s["hits"] + s["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return {
+            "agents": per_agent,
+            "size": size,
+            "max_entries": self.max_entries,
+            "evictions": evictions,
+            "purged_expired": purged,
+            "persistent": bool(self.db_path),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the process-wide response cache, created on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
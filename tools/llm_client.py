@@ -0,0 +1,123 @@
+import json
+import random
+import threading
+import time
+
+from config import (
+    LLM_MODEL,
+    LLM_TIMEOUT_S,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_S,
+    LLM_CACHE_ENABLED,
+    logger,
+)
+from tools.llm_backends import get_backend
+from tools.llm_cache import cache_key, get_response_cache, ttl_for
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(agent, latency_ms, retries, error=False, prompt_tokens=0, output_tokens=0):
+    with _stats_lock:
+        s = _stats.setdefault(
+            agent,
+            {
+                "calls": 0,
+                "errors": 0,
+                "retries": 0,
+                "latency_ms_total": 0.0,
+                "latency_ms_max": 0.0,
+                "prompt_tokens": 0,
+                "output_tokens": 0,
+            },
+        )
+        s["calls"] += 1
+        s["errors"] += int(error)
+        s["retries"] += retries
+        s["latency_ms_total"] += latency_ms
+        s["latency_ms_max"] = max(s["latency_ms_max"], latency_ms)
+        s["prompt_tokens"] += prompt_tokens
+        s["output_tokens"] += output_tokens
+
+
+def generate_text(
+    prompt, agent="default", model_name=LLM_MODEL, generation_config=None, use_cache=True
+):
+    """
+    Send prompt to the configured LLM backend and return the response text.
+
+    Identical requests are answered from the response cache while the
+    agent's TTL holds. Otherwise applies the configured request timeout and
+    retries the backend's transient errors with exponential backoff. Latency
+    and token usage are tracked per agent (see llm_stats()). Non-retryable
+    errors and exhausted retries propagate.
+    """
+    backend = get_backend()
+    ttl = ttl_for(agent) if (use_cache and LLM_CACHE_ENABLED) else 0
+    if ttl > 0:
+        # Backend name is part of the key so stand-in answers never leak into live runs
+        key = cache_key(f"{backend.name}:{model_name}", prompt, generation_config)
+        cached = get_response_cache().get(key, agent)
+        if cached is not None:
+            return cached
+
+    retryable = backend.retryable_errors()
+    started = time.perf_counter()
+    attempt = 0
+    while True:
+        try:
+            response = backend.generate(prompt, agent, model_name, generation_config, LLM_TIMEOUT_S)
+            break
+        except retryable as e:
+            if attempt >= LLM_MAX_RETRIES:
+                _record(agent, (time.perf_counter() - started) * 1000, attempt, error=True)
+                raise
+            delay = LLM_BACKOFF_S * (2**attempt) * (1 + random.random())
+            logger.warning("LLM call failed (%s), retrying in %.2fs", type(e).__name__, delay)
+            time.sleep(delay)
+            attempt += 1
+        except Exception:
+            _record(agent, (time.perf_counter() - started) * 1000, attempt, error=True)
+            raise
+
+    _record(
+        agent,
+        (time.perf_counter() - started) * 1000,
+        attempt,
+        prompt_tokens=response.prompt_tokens,
+        output_tokens=response.output_tokens,
+    )
+    if ttl > 0:
+        get_response_cache().put(key, response.text, ttl, agent)
+    return response.text
+
+
+def llm_stats():
+    """Return per-agent call counts, latency and token totals."""
+    with _stats_lock:
+        snapshot = {agent: dict(s) for agent, s in _stats.items()}
+    for s in snapshot.values():
+        s["latency_ms_avg"] = round(s["latency_ms_total"] / s["calls"], 2) if s["calls"] else 0.0
+        s["latency_ms_total"] = round(s["latency_ms_total"], 2)
+        s["latency_ms_max"] = round(s["latency_ms_max"], 2)
+    return snapshot
+
+
+def parse_json_response(text):
+    """Parse a JSON object from model output, tolerating ```json fences; None if invalid."""
+    if not text:
+        return None
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.strip("`")
+        if cleaned.lower().startswith("json"):
+            cleaned = cleaned[4:]
+    start, end = cleaned.find("{"), cleaned.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        parsed = json.loads(cleaned[start : end + 1])
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
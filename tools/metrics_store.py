@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+
+from tools.db_pool import get_connection, transaction
+
+# Statuses that still need work
+OPEN_STATUSES = ("open", "escalated")
+
+# Full recompute of the materialized metrics from the base tables. Normal
+# upkeep is incremental (triggers from migration 8); this is for backfills
+# and scheduled consistency repairs.
+REBUILD_SQL = [
+    "DELETE FROM metrics_ticket_daily",
+    "DELETE FROM metrics_ticket_sla",
+    "DELETE FROM metrics_source_stats",
+    """
+    INSERT INTO metrics_ticket_daily (day, status, priority, ticket_count)
+    SELECT substr(created_at, 1, 10), COALESCE(status, 'unknown'),
+           COALESCE(priority, 'unknown'), COUNT(*)
+    FROM tickets
+    GROUP BY 1, 2, 3
+    """,
+    """
+    INSERT INTO metrics_ticket_sla (day, priority, resolved_count, breached_count, resolution_hours_total)
+    SELECT day, priority, COUNT(*), SUM(COALESCE(hours > target, 0)), SUM(hours)
+    FROM (
+        SELECT substr(t.created_at, 1, 10) AS day,
+               COALESCE(t.priority, 'unknown') AS priority,
+               (julianday(t.resolved_at) - julianday(t.created_at)) * 24 AS hours,
+               COALESCE(s.hours, d.hours) AS target
+        FROM tickets t
+        LEFT JOIN sla_targets s ON s.priority = t.priority
+        LEFT JOIN sla_targets d ON d.priority = 'default'
+    )
+    WHERE hours IS NOT NULL  -- resolved, with timestamps julianday() can parse
+    GROUP BY 1, 2
+    """,
+    """
+    INSERT INTO metrics_source_stats (source_id, row_count, quality_score_total, last_ingested_at)
+    SELECT COALESCE(source_id, 'unknown'), COUNT(*), COALESCE(SUM(quality_score), 0), MAX(ingested_at)
+    FROM unified_data
+    GROUP BY 1
+    """,
+]
+
+
+def rebuild_metrics(conn=None):
+    """Recompute every metrics table from scratch (inside the caller's transaction if given)."""
+    if conn is not None:
+        for sql in REBUILD_SQL:
+            conn.execute(sql)
+        return
+    with transaction() as conn:
+        for sql in REBUILD_SQL:
+            conn.execute(sql)
+
+
+def ticket_stats(days=None):
+    """Ticket counts by status and priority, optionally for the last N days."""
+    where, params = "ticket_count != 0", []
+    if days is not None:
+        where += " AND day >= ?"
+        params.append((datetime.utcnow() - timedelta(days=days)).date().isoformat())
+    rows = get_connection().execute(
+        f"""
+        SELECT status, priority, SUM(ticket_count) AS n
+        FROM metrics_ticket_daily
+        WHERE {where}
+        GROUP BY status, priority
+        """,
+        params,
+    ).fetchall()
+
+    by_status, by_priority = {}, {}
+    for status, priority, n in rows:
+        by_status[status] = by_status.get(status, 0) + n
+        by_priority[priority] = by_priority.get(priority, 0) + n
+    return {
+        "total_tickets": sum(by_status.values()),
+        "open_tickets": sum(by_status.get(s, 0) for s in OPEN_STATUSES),
+        "high_priority": sum(
+            n for status, priority, n in rows if priority == "high" and status in OPEN_STATUSES
+        ),
+        "by_status": by_status,
+        "by_priority": by_priority,
+    }
+
+
+def sla_stats(days=None):
+    """SLA breach rate and mean resolution time of resolved tickets."""
+    where, params = "", []
+    if days is not None:
+        where = "WHERE day >= ?"
+        params.append((datetime.utcnow() - timedelta(days=days)).date().isoformat())
+    resolved, breached, hours = get_connection().execute(
+        f"""
+        SELECT COALESCE(SUM(resolved_count), 0), COALESCE(SUM(breached_count), 0),
+               COALESCE(SUM(resolution_hours_total), 0)
+        FROM metrics_ticket_sla {where}
+        """,
+        params,
+    ).fetchone()
+    return {
+        "resolved_tickets": resolved,
+        "breached_tickets": breached,
+        "breach_rate": round(breached / resolved, 4) if resolved else 0.0,
+        "avg_resolution_hours": round(hours / resolved, 2) if resolved else None,
+    }
+
+
+def source_stats(limit=10):
+    """
+    Row counts and mean quality of ingested sources, largest first.
+
+    unified_data sources come from the trigger-maintained metrics table;
+    columnar sources keep their row count and quality score in
+    source_catalog and are read from there.
+    """
+    rows = get_connection().execute(
+        """
+        SELECT source_id, row_count, quality_score_total, last_ingested_at
+        FROM metrics_source_stats
+        WHERE row_count > 0
+        UNION ALL
+        SELECT source_id, row_count, COALESCE(quality_score, 0) * row_count, last_ingested
+        FROM source_catalog
+        WHERE storage = 'columnar' AND row_count > 0
+        ORDER BY row_count DESC
+        """
+    ).fetchall()
+    total = sum(r["row_count"] for r in rows)
+    return {
+        "source_count": len(rows),
+        "total_rows": total,
+        "avg_quality_score": (
+            round(sum(r["quality_score_total"] for r in rows) / total, 4) if total else None
+        ),
+        "top_sources": [
+            {
+                "source_id": r["source_id"],
+                "rows": r["row_count"],
+                "avg_quality_score": round(r["quality_score_total"] / r["row_count"], 4),
+                "last_ingested_at": r["last_ingested_at"],
+            }
+            for r in rows[:limit]
+        ],
+    }
+
+
+def get_live_metrics(days=None):
+    """Current ticket, SLA and data source metrics from the materialized tables."""
+    return {
+        "ticket_stats": ticket_stats(days),
+        "sla": sla_stats(days),
+        "data_sources": source_stats(),
+    }
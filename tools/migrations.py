@@ -0,0 +1,374 @@
+from datetime import datetime
+
+from config import logger
+from tools.db_pool import get_connection, transaction
+from tools.metrics_store import rebuild_metrics
+
+
+def _ticket_metrics_sql(row, sign):
+    """
+    Trigger statements adding (sign=1) or removing (sign=-1) one ticket row.
+
+    Tickets whose created_at/resolved_at julianday() cannot parse have no
+    resolution time and are left out of metrics_ticket_sla, as in
+    metrics_store.REBUILD_SQL.
+    """
+    return f"""
+        INSERT INTO metrics_ticket_daily (day, status, priority, ticket_count)
+        VALUES (substr({row}.created_at, 1, 10), COALESCE({row}.status, 'unknown'),
+                COALESCE({row}.priority, 'unknown'), {sign})
+        ON CONFLICT (day, status, priority) DO UPDATE SET ticket_count = ticket_count + {sign};
+        INSERT INTO metrics_ticket_sla (day, priority, resolved_count, breached_count, resolution_hours_total)
+        SELECT day, priority, {sign}, {sign} * COALESCE(hours > target, 0), {sign} * hours
+        FROM (
+            SELECT substr({row}.created_at, 1, 10) AS day,
+                   COALESCE({row}.priority, 'unknown') AS priority,
+                   (julianday({row}.resolved_at) - julianday({row}.created_at)) * 24 AS hours,
+                   COALESCE(
+                       (SELECT hours FROM sla_targets WHERE priority = {row}.priority),
+                       (SELECT hours FROM sla_targets WHERE priority = 'default')
+                   ) AS target
+        )
+        WHERE hours IS NOT NULL
+        ON CONFLICT (day, priority) DO UPDATE SET
+            resolved_count = resolved_count + excluded.resolved_count,
+            breached_count = breached_count + excluded.breached_count,
+            resolution_hours_total = resolution_hours_total + excluded.resolution_hours_total;
+    """
+
+
+_TICKET_TRIGGERS = (
+    "trg_tickets_metrics_insert",
+    "trg_tickets_metrics_update",
+    "trg_tickets_metrics_delete",
+)
+
+
+def _ticket_trigger_sql():
+    """CREATE TRIGGER statements keeping the ticket metrics tables current."""
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tickets_metrics_insert AFTER INSERT ON tickets
+        BEGIN {_ticket_metrics_sql("NEW", 1)} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tickets_metrics_update
+        AFTER UPDATE OF created_at, status, priority, resolved_at ON tickets
+        BEGIN {_ticket_metrics_sql("OLD", -1)} {_ticket_metrics_sql("NEW", 1)} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tickets_metrics_delete AFTER DELETE ON tickets
+        BEGIN {_ticket_metrics_sql("OLD", -1)} END
+        """,
+    ]
+
+
+def _recreate_ticket_metrics_triggers(conn):
+    """Replace the ticket metrics triggers with the current _ticket_metrics_sql()."""
+    for name in _TICKET_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    for sql in _ticket_trigger_sql():
+        conn.execute(sql)
+
+
+def _source_metrics_sql(row, sign):
+    """Trigger statement adding (sign=1) or removing (sign=-1) one unified_data row."""
+    return f"""
+        INSERT INTO metrics_source_stats (source_id, row_count, quality_score_total, last_ingested_at)
+        VALUES (COALESCE({row}.source_id, 'unknown'), {sign},
+                {sign} * COALESCE({row}.quality_score, 0), {row}.ingested_at)
+        ON CONFLICT (source_id) DO UPDATE SET
+            row_count = row_count + excluded.row_count,
+            quality_score_total = quality_score_total + excluded.quality_score_total,
+            last_ingested_at = MAX(COALESCE(last_ingested_at, ''), COALESCE(excluded.last_ingested_at, ''));
+    """
+
+
+# Ordered schema migrations. Each entry is (version, name, steps) where a step
+# is either a SQL string or a callable taking the connection. Append new
+# migrations at the end; never edit one that has shipped.
+MIGRATIONS = [
+    (
+        1,
+        "create tickets and data_quality_runs",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS tickets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticket_id TEXT,
+                customer_id TEXT,
+                channel TEXT,
+                message TEXT,
+                intent TEXT,
+                priority TEXT,
+                status TEXT,
+                created_at TEXT,
+                resolved_at TEXT,
+                agent_result_json TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS data_quality_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                dataset_name TEXT,
+                uploaded_by TEXT,
+                uploaded_at TEXT,
+                row_count INTEGER,
+                issue_count INTEGER,
+                score REAL,
+                result_json TEXT
+            )
+            """,
+        ],
+    ),
+    (
+        2,
+        "create unified_data",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS unified_data (
+                id INTEGER PRIMARY KEY,
+                source_id TEXT,
+                data_type TEXT,
+                raw_data TEXT,
+                cleaned_data TEXT,
+                quality_score REAL,
+                ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        ],
+    ),
+    (
+        3,
+        "index ticket history and data quality run listings",
+        [
+            """
+            CREATE INDEX IF NOT EXISTS idx_tickets_customer_created
+            ON tickets (customer_id, created_at DESC, id DESC)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_dq_runs_uploaded
+            ON data_quality_runs (uploaded_at DESC, id DESC)
+            """,
+        ],
+    ),
+    (
+        4,
+        "create data_quality_partitions",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS data_quality_partitions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER REFERENCES data_quality_runs (id),
+                dataset_name TEXT,
+                partition_key TEXT,
+                fingerprint TEXT,
+                row_count INTEGER,
+                profile_json TEXT
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_dq_partitions_dataset
+            ON data_quality_partitions (dataset_name, run_id DESC)
+            """,
+        ],
+    ),
+    (
+        5,
+        "index unified_data pages by source",
+        [
+            """
+            CREATE INDEX IF NOT EXISTS idx_unified_source_id
+            ON unified_data (source_id, id)
+            """,
+        ],
+    ),
+    (
+        6,
+        "create source_catalog",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS source_catalog (
+                source_id TEXT PRIMARY KEY,
+                table_name TEXT NOT NULL,
+                storage TEXT NOT NULL,
+                schema_json TEXT,
+                row_count INTEGER DEFAULT 0,
+                quality_score REAL,
+                last_ingested TEXT
+            )
+            """,
+        ],
+    ),
+    (
+        7,
+        "add row hashes to unified_data and create ingestion_manifests",
+        [
+            "ALTER TABLE unified_data ADD COLUMN row_hash TEXT",
+            "ALTER TABLE unified_data ADD COLUMN row_key TEXT",
+            # Rows ingested before this migration have no key and never conflict
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_unified_source_key
+            ON unified_data (source_id, row_key)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS ingestion_manifests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_id TEXT,
+                file_fingerprint TEXT,
+                file_size INTEGER,
+                storage TEXT,
+                key_column TEXT,
+                status TEXT,
+                rows_read INTEGER DEFAULT 0,
+                rows_inserted INTEGER DEFAULT 0,
+                rows_updated INTEGER DEFAULT 0,
+                rows_unchanged INTEGER DEFAULT 0,
+                error TEXT,
+                started_at TEXT,
+                finished_at TEXT
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_manifests_fingerprint
+            ON ingestion_manifests (source_id, file_fingerprint, status)
+            """,
+        ],
+    ),
+    (
+        8,
+        "create materialized ticket and source metrics",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS sla_targets (
+                priority TEXT PRIMARY KEY,
+                hours REAL NOT NULL
+            )
+            """,
+            """
+            INSERT OR IGNORE INTO sla_targets (priority, hours)
+            VALUES ('high', 4), ('medium', 24), ('low', 72), ('default', 24)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS metrics_ticket_daily (
+                day TEXT,
+                status TEXT,
+                priority TEXT,
+                ticket_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, status, priority)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS metrics_ticket_sla (
+                day TEXT,
+                priority TEXT,
+                resolved_count INTEGER NOT NULL DEFAULT 0,
+                breached_count INTEGER NOT NULL DEFAULT 0,
+                resolution_hours_total REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, priority)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS metrics_source_stats (
+                source_id TEXT PRIMARY KEY,
+                row_count INTEGER NOT NULL DEFAULT 0,
+                quality_score_total REAL NOT NULL DEFAULT 0,
+                last_ingested_at TEXT
+            )
+            """,
+            *_ticket_trigger_sql(),
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_unified_metrics_insert AFTER INSERT ON unified_data
+            BEGIN {_source_metrics_sql("NEW", 1)} END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_unified_metrics_update
+            AFTER UPDATE OF source_id, quality_score ON unified_data
+            BEGIN {_source_metrics_sql("OLD", -1)} {_source_metrics_sql("NEW", 1)} END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_unified_metrics_delete AFTER DELETE ON unified_data
+            BEGIN {_source_metrics_sql("OLD", -1)} END
+            """,
+            rebuild_metrics,  # backfill existing history
+        ],
+    ),
+    (
+        9,
+        "create eval_case_results",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS eval_case_results (
+                suite TEXT NOT NULL,
+                input_hash TEXT NOT NULL,
+                agent_version TEXT NOT NULL,
+                case_id TEXT,
+                result_json TEXT,
+                created_at TEXT,
+                PRIMARY KEY (suite, agent_version, input_hash)
+            )
+            """,
+        ],
+    ),
+    (
+        10,
+        "skip unparseable ticket timestamps in SLA metrics",
+        [
+            _recreate_ticket_metrics_triggers,
+            rebuild_metrics,
+        ],
+    ),
+    (
+        11,
+        "record rows removed by re-ingestion",
+        [
+            "ALTER TABLE ingestion_manifests ADD COLUMN rows_deleted INTEGER DEFAULT 0",
+        ],
+    ),
+]
+
+
+def current_version(conn):
+    """Return the highest applied migration version (0 for a fresh DB)."""
+    row = conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()
+    return row[0] or 0
+
+
+def migrate(target=None):
+    """
+    Apply pending migrations in order, each in its own transaction.
+
+    Safe to call on every startup: applied versions are recorded in
+    schema_migrations and skipped. Returns the resulting schema version.
+    """
+    with transaction() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT,
+                applied_at TEXT
+            )
+            """
+        )
+
+    for mig_version, name, steps in MIGRATIONS:
+        if target is not None and mig_version > target:
+            break
+        with transaction() as conn:
+            # Re-check under the write lock so concurrent workers apply once
+            version = current_version(conn)
+            if mig_version <= version:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+                (mig_version, name, datetime.utcnow().isoformat()),
+            )
+        logger.info("Applied migration %s: %s", mig_version, name)
+
+    return current_version(get_connection())
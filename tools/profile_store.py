@@ -0,0 +1,95 @@
+import csv
+import os
+import threading
+
+from config import logger
+
+CUSTOMER_PROFILES_PATH = "data/customer_profiles.csv"
+
+
+def _coerce(value):
+    """Parse a CSV cell into int/float where possible (matches pandas dtypes)."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _key(customer_id):
+    return str(customer_id).strip()
+
+
+class CustomerProfileStore:
+    """
+    Customer profiles held in memory, keyed by customer_id.
+
+    The CSV is parsed once; every lookup does a cheap os.stat and reloads only
+    when the file's mtime or size changes. Lookups are a single dict probe.
+    """
+
+    def __init__(self, path=CUSTOMER_PROFILES_PATH):
+        self.path = path
+        self._profiles = {}
+        self._signature = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, signature):
+        profiles = {}
+        if signature is not None:
+            with open(self.path, newline="", encoding="utf-8-sig") as f:
+                for row in csv.DictReader(f):
+                    profile = {col: _coerce(val) for col, val in row.items()}
+                    profiles[_key(row["customer_id"])] = profile
+        else:
+            logger.warning("Customer profile file not found: %s", self.path)
+
+        self._profiles = profiles
+        self._signature = signature
+        self._loaded = True
+        logger.info("Loaded %d customer profiles from %s", len(profiles), self.path)
+
+    def refresh(self, force=False):
+        """Reload the profiles if the file changed (or unconditionally with force)."""
+        signature = self._file_signature()
+        if not force and self._loaded and signature == self._signature:
+            return
+        with self._lock:
+            if force or not self._loaded or signature != self._signature:
+                self._load(signature)
+
+    def get(self, customer_id):
+        """Return the profile dict for customer_id, or None if unknown."""
+        self.refresh()
+        return self._profiles.get(_key(customer_id))
+
+    def __len__(self):
+        self.refresh()
+        return len(self._profiles)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store():
+    """Return the process-wide profile store, created on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CustomerProfileStore()
+    return _store
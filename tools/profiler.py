@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+
+from tools.sketches import HyperLogLog, TDigest, hash_values
+
+# Rows per chunk when profiling files; bounds memory regardless of file size.
+PROFILE_CHUNK_SIZE = 100_000
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+_FNV_OFFSET = np.uint64(1469598103934665603)
+_FNV_PRIME = np.uint64(1099511628211)
+
+
+def combine_row_hashes(column_hashes, n_rows):
+    """Fold per-column value hashes into one 64-bit hash per row (FNV-style)."""
+    row_hash = np.full(n_rows, _FNV_OFFSET, dtype=np.uint64)
+    for hashes in column_hashes:
+        row_hash = (row_hash ^ hashes) * _FNV_PRIME
+    return row_hash
+
+
+def row_hashes(chunk):
+    """64-bit content hash of each row, stable across chunks and int/float dtypes."""
+    return combine_row_hashes((hash_values(chunk[name]) for name in chunk.columns), len(chunk))
+
+
+def infer_type(series):
+    """Map a pandas dtype to the profiler's logical types."""
+    kind = series.dtype.kind
+    if kind in "iuf":
+        return "numeric"
+    if kind == "b":
+        return "bool"
+    if kind == "M":
+        return "datetime"
+    return "string"
+
+
+def _conformance(values, expected_type):
+    """Return (conforming mask, numeric values or None) for non-null values."""
+    if expected_type == "numeric":
+        numeric = pd.to_numeric(values, errors="coerce")
+        return numeric.notna(), numeric
+    if expected_type == "datetime":
+        return pd.to_datetime(values, errors="coerce").notna(), None
+    if expected_type == "bool":
+        return values.astype(str).str.lower().isin({"true", "false", "0", "1"}), None
+    return pd.Series(True, index=values.index), None
+
+
+class ColumnProfile:
+    """Mergeable per-column stats: nulls, distinct sketch, type conformance, numeric digest."""
+
+    def __init__(self, name, expected_type=None):
+        self.name = name
+        self.expected_type = expected_type
+        self.rows = 0
+        self.nulls = 0
+        self.conforming = 0
+        self.hll = HyperLogLog()
+        self.digest = TDigest()
+
+    def update(self, series, hashes):
+        """Fold one chunk of the column in; hashes are its per-value hashes."""
+        not_null = series.notna().to_numpy()
+        non_null = series[not_null]
+        if self.expected_type is None and len(non_null):
+            self.expected_type = infer_type(non_null.infer_objects())
+
+        self.rows += len(series)
+        self.nulls += int(len(series) - len(non_null))
+        self.hll.add_hashes(hashes[not_null])
+
+        conforming, numeric = _conformance(non_null, self.expected_type)
+        self.conforming += int(conforming.sum())
+        if numeric is not None:
+            self.digest.update(numeric.to_numpy(dtype=np.float64, na_value=np.nan))
+
+    def merge(self, other):
+        if self.expected_type is None:
+            self.expected_type = other.expected_type
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.conforming += other.conforming
+        self.hll.merge(other.hll)
+        self.digest.merge(other.digest)
+        return self
+
+    def summary(self):
+        non_null = self.rows - self.nulls
+        summary = {
+            "type": self.expected_type or "unknown",
+            "null_count": self.nulls,
+            "null_rate": round(self.nulls / self.rows, 4) if self.rows else 0.0,
+            "distinct_estimate": int(round(self.hll.estimate())),
+            "nonconforming_count": non_null - self.conforming,
+            "type_conformance": round(self.conforming / non_null, 4) if non_null else 1.0,
+        }
+        if self.digest.count:
+            summary["min"] = self.digest.min
+            summary["max"] = self.digest.max
+            summary["quantiles"] = {
+                f"p{int(q * 100):02d}": self.digest.quantile(q) for q in QUANTILES
+            }
+        return summary
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "expected_type": self.expected_type,
+            "rows": self.rows,
+            "nulls": self.nulls,
+            "conforming": self.conforming,
+            "hll": self.hll.to_dict(),
+            "digest": self.digest.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        column = cls(data["name"], data["expected_type"])
+        column.rows = data["rows"]
+        column.nulls = data["nulls"]
+        column.conforming = data["conforming"]
+        column.hll = HyperLogLog.from_dict(data["hll"])
+        column.digest = TDigest.from_dict(data["digest"])
+        return column
+
+
+class DatasetProfile:
+    """
+    Single-pass, chunked data-quality profile of a tabular dataset.
+
+    update() takes one DataFrame chunk at a time and does vectorized work
+    per column, so files larger than memory can be profiled. Duplicate rows
+    are found exactly from 8-byte row hashes kept for the current pass;
+    profiles restored with from_dict() carry their duplicate count only, so
+    merged profiles report duplicates found within each part unless the
+    row hashes of all parts are supplied with use_row_hashes().
+    """
+
+    def __init__(self, schema=None):
+        self.schema = schema or {}
+        self.columns = {}
+        self.rows = 0
+        self._row_hashes = []
+        self._merged_duplicates = 0
+
+    def update(self, chunk):
+        column_hashes = {name: hash_values(chunk[name]) for name in chunk.columns}
+        for name, hashes in column_hashes.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = ColumnProfile(name, self.schema.get(name))
+            column.update(chunk[name], hashes)
+        self._row_hashes.append(combine_row_hashes(column_hashes.values(), len(chunk)))
+        self.rows += len(chunk)
+        return self
+
+    def merge(self, other):
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                # Copy so later merges never mutate the other profile
+                self.columns[name] = ColumnProfile.from_dict(column.to_dict())
+        self.rows += other.rows
+        self._merged_duplicates += other.duplicate_rows()
+        return self
+
+    def use_row_hashes(self, hashes):
+        """Count duplicates over these row hashes (every row of the dataset) instead of per part."""
+        self._row_hashes = list(hashes)
+        self._merged_duplicates = 0
+        return self
+
+    def duplicate_rows(self):
+        own = 0
+        if self._row_hashes:
+            hashes = np.concatenate(self._row_hashes)
+            own = int(len(hashes) - len(np.unique(hashes)))
+        return own + self._merged_duplicates
+
+    def summary(self):
+        """Dataset-level quality summary (null, type and duplicate issues plus per-column stats)."""
+        columns = {name: column.summary() for name, column in self.columns.items()}
+        null_cells = sum(c["null_count"] for c in columns.values())
+        nonconforming = sum(c["nonconforming_count"] for c in columns.values())
+        duplicates = self.duplicate_rows()
+        issue_count = null_cells + nonconforming + duplicates
+        cells = self.rows * len(columns)
+        return {
+            "columns": list(columns),
+            "row_count": self.rows,
+            "column_count": len(columns),
+            "null_counts": {name: c["null_count"] for name, c in columns.items()},
+            "null_cells": null_cells,
+            "nonconforming_cells": nonconforming,
+            "duplicate_rows": duplicates,
+            "issue_count": issue_count,
+            "score": max(0.0, 1.0 - issue_count / max(1, cells)),
+            "column_profiles": columns,
+        }
+
+    def to_dict(self):
+        return {
+            "schema": self.schema,
+            "rows": self.rows,
+            "duplicate_rows": self.duplicate_rows(),
+            "columns": [column.to_dict() for column in self.columns.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = cls(schema=data.get("schema"))
+        profile.rows = data["rows"]
+        profile._merged_duplicates = data["duplicate_rows"]
+        for column in data["columns"]:
+            profile.columns[column["name"]] = ColumnProfile.from_dict(column)
+        return profile
+
+
+def merge_column_batches(profiles):
+    """
+    Combine profiles of disjoint column batches of the same rows.
+
+    Column stats are taken as they are; each batch's row hashes are folded
+    again so duplicate rows are counted over all columns.
+    """
+    total = DatasetProfile()
+    row_hashes_by_batch = []
+    for profile in profiles:
+        total.schema.update(profile.schema)
+        total.columns.update(profile.columns)
+        total.rows = profile.rows
+        row_hashes_by_batch.append(np.concatenate(profile._row_hashes))
+    return total.use_row_hashes([combine_row_hashes(row_hashes_by_batch, total.rows)])
+
+
+def profile_chunks(chunks, schema=None):
+    """Profile an iterable of DataFrame chunks."""
+    profile = DatasetProfile(schema)
+    for chunk in chunks:
+        profile.update(chunk)
+    return profile
+
+
+def profile_dataframe(df, schema=None):
+    return profile_chunks([df], schema)
+
+
+def profile_csv(source, chunksize=PROFILE_CHUNK_SIZE, schema=None):
+    """Profile a CSV path or file object in bounded-size chunks."""
+    return profile_chunks(pd.read_csv(source, chunksize=chunksize), schema)
@@ -0,0 +1,100 @@
+import re
+
+import pandas as pd
+
+# Valid email shape, used for columns whose name mentions "email"
+EMAIL_RE = r"^[^@\s]+@[^@\s]+\.[A-Za-z]{2,}$"
+
+# Patterns that suggest personal data in free-text columns
+PII_PATTERNS = {
+    "email": re.compile(r"[^@\s]+@[^@\s]+\.[A-Za-z]{2,}"),
+    "phone": re.compile(r"(?:\+?\d[\s().-]?){10,14}"),
+    "ssn": re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),
+    "credit_card": re.compile(r"\b(?:\d[ -]?){13,16}\b"),
+}
+
+# (min, max) allowed values by column name; None means unbounded
+DEFAULT_RANGES = {
+    "age": (0, 120),
+    "sla_hours": (0, 720),
+    "quality_score": (0, 1),
+    "lifetime_value": (0, None),
+    "last_purchase_amount": (0, None),
+    "response_time": (0, None),
+}
+
+# Rows sampled per column for PII pattern detection
+PII_SAMPLE_ROWS = 1000
+
+
+def merge_ranges(ranges=None):
+    """DEFAULT_RANGES with caller overrides applied (keys matched case-insensitively)."""
+    if not ranges:
+        return DEFAULT_RANGES
+    return {**DEFAULT_RANGES, **{str(name).lower(): bounds for name, bounds in ranges.items()}}
+
+
+def check_column(name, values, ranges=None):
+    """
+    Run the rule set on one column; returns its missing count and issues.
+
+    ranges overrides DEFAULT_RANGES per column name; map a name to None to
+    switch its range check off.
+    """
+    ranges = merge_ranges(ranges)
+    non_null = values.dropna()
+    result = {"column": name, "missing": int(len(values) - len(non_null)), "issues": [], "pii": []}
+
+    if result["missing"]:
+        result["issues"].append(
+            {
+                "type": "MissingValues",
+                "detail": f"{result['missing']} rows have null {name} out of {len(values)}.",
+                "count": result["missing"],
+            }
+        )
+
+    if non_null.empty:
+        return result
+
+    is_text = values.dtype == object or pd.api.types.is_string_dtype(values.dtype)
+    text = non_null.astype(str) if is_text else None
+
+    if "email" in name.lower() and text is not None:
+        result["pii"].append("email")
+        invalid = int((~text.str.match(EMAIL_RE)).sum())
+        if invalid:
+            result["issues"].append(
+                {"type": "InvalidEmail", "detail": f"{invalid} malformed {name} values.", "count": invalid}
+            )
+    elif text is not None:
+        sample = text.head(PII_SAMPLE_ROWS)
+        for kind, pattern in PII_PATTERNS.items():
+            if sample.str.contains(pattern).any():
+                result["pii"].append(kind)
+
+    bounds = ranges.get(name.lower())
+    if bounds is not None:
+        numeric = pd.to_numeric(non_null, errors="coerce")
+        low, high = bounds
+        out_of_range = pd.Series(False, index=numeric.index)
+        if low is not None:
+            out_of_range |= numeric < low
+        if high is not None:
+            out_of_range |= numeric > high
+        count = int(out_of_range.sum())
+        if count:
+            result["issues"].append(
+                {
+                    "type": "OutOfRange",
+                    "detail": f"{count} {name} values outside [{low}, {high}].",
+                    "count": count,
+                }
+            )
+
+    return result
+
+
+def check_columns(frame, ranges=None):
+    """Run check_column over every column of frame (one worker's batch)."""
+    return [check_column(str(name), frame[name], ranges) for name in frame.columns]
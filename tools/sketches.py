@@ -0,0 +1,166 @@
+import base64
+import math
+
+import numpy as np
+
+
+def hash_values(values):
+    """64-bit hashes of a Series' values; numbers hash by float value so 1 == 1.0."""
+    import pandas as pd  # deferred: the TDigest users do not need pandas
+
+    if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        values = values.astype("float64")
+    else:
+        values = values.astype(str)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+class HyperLogLog:
+    """Distinct-count sketch with 2**p one-byte registers (~1.04/sqrt(2**p) error)."""
+
+    def __init__(self, p=12, registers=None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = (
+            registers if registers is not None else np.zeros(self.m, dtype=np.uint8)
+        )
+
+    def add_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not hashes.size:
+            return
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes << np.uint64(self.p)
+        # rank = leading zeros of the remaining bits + 1
+        rank = np.full(hashes.shape, 64 - self.p + 1, dtype=np.uint8)
+        nonzero = rest != 0
+        top_bit = np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.int64)
+        rank[nonzero] = np.minimum(63 - top_bit + 1, 64 - self.p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def estimate(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            return self.m * math.log(self.m / zeros)  # linear counting for small sets
+        return float(raw)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def to_dict(self):
+        return {"p": self.p, "registers": base64.b64encode(self.registers.tobytes()).decode()}
+
+    @classmethod
+    def from_dict(cls, data):
+        registers = np.frombuffer(base64.b64decode(data["registers"]), dtype=np.uint8).copy()
+        return cls(p=data["p"], registers=registers)
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch (merging t-digest with the arcsine scale function).
+
+    Values are buffered and folded into at most ~compression/2 centroids in
+    one vectorized pass, so memory stays bounded however many values arrive.
+    """
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []
+        self._buffer_weights = []
+        self._buffered = 0
+
+    def update(self, values, weights=None):
+        """Add values; weights (optional, same length) count each value that many times."""
+        values = np.asarray(values, dtype=np.float64)
+        if weights is None:
+            values = values[~np.isnan(values)]
+            weights = np.ones(values.size)
+            added = values.size
+        else:
+            weights = np.asarray(weights, dtype=np.float64)
+            keep = ~np.isnan(values) & (weights > 0)
+            values, weights = values[keep], weights[keep]
+            added = float(weights.sum())
+        if not values.size:
+            return
+        self._buffer.append(values)
+        self._buffer_weights.append(weights)
+        self._buffered += values.size
+        self.count += added
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self._buffered >= 20 * self.compression:
+            self._compress()
+
+    def _compress(self, extra_means=None, extra_weights=None):
+        means = [self.means] + self._buffer
+        weights = [self.weights] + self._buffer_weights
+        if extra_means is not None:
+            means.append(extra_means)
+            weights.append(extra_weights)
+        if len(means) == 1:
+            return
+        means, weights = np.concatenate(means), np.concatenate(weights)
+        self._buffer, self._buffer_weights, self._buffered = [], [], 0
+
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q_left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * q_left - 1, -1, 1))
+        _, bucket = np.unique(np.floor(k - k[0]).astype(np.int64), return_inverse=True)
+
+        w = np.bincount(bucket, weights=weights)
+        self.means = np.bincount(bucket, weights=weights * means) / w
+        self.weights = w
+
+    def merge(self, other):
+        """Fold another digest's centroids into this one."""
+        other._compress()
+        if other.count:
+            self._compress(other.means, other.weights)
+            self.count += other.count
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        self._compress()
+        if not self.count:
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        centers = np.cumsum(self.weights) - self.weights / 2
+        xs = np.concatenate([[0.0], centers, [self.weights.sum()]])
+        ys = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * self.weights.sum(), xs, ys))
+
+    def to_dict(self):
+        self._compress()
+        return {
+            "compression": self.compression,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = cls(compression=data["compression"])
+        digest.means = np.asarray(data["means"], dtype=np.float64)
+        digest.weights = np.asarray(data["weights"], dtype=np.float64)
+        digest.count = data["count"]
+        if digest.count:
+            digest.min, digest.max = data["min"], data["max"]
+        return digest
@@ -1,22 +1,32 @@
-import pandas as pd
-import json
+from tools.kb_search import CONFIDENCE_CEILING, CONFIDENCE_FLOOR, get_knowledge_base
+from tools.profile_store import get_profile_store
 
-def search_kb(query):
-    """Search knowledge base (mock FAQ)"""
-    faq_data = {
-        "reset password": "To reset your password, click 'Forgot Password' on login screen and follow email instructions.",
-        "payment failed": "Payment failures occur due to: 1) Card expired 2) Insufficient funds 3) Bank blocks. Try different card or contact bank.",
-        "order status": "Check order status in your account dashboard or use tracking link in confirmation email.",
-        "app crash": "Clear app cache, update to latest version, or contact support with device details."
+def search_kb(query, top_k=3):
+    """Search the knowledge base; returns the best answer plus top-k scored matches."""
+    kb = get_knowledge_base().snapshot()  # one consistent index for all lookups below
+    hits = kb.search(query, top_k=top_k)
+    if not hits:
+        return {"answer": "No matching FAQ found", "confidence": CONFIDENCE_FLOOR, "results": []}
+
+    best_id, _ = hits[0]
+    coverage = kb.keyword_coverage(best_id, query)
+    confidence = CONFIDENCE_FLOOR + (CONFIDENCE_CEILING - CONFIDENCE_FLOOR) * coverage
+    results = [
+        {
+            "article_id": kb.articles[doc_id]["article_id"],
+            "title": kb.articles[doc_id]["title"],
+            "score": round(score, 4),
+        }
+        for doc_id, score in hits
+    ]
+    return {
+        "answer": kb.articles[best_id]["answer"],
+        "confidence": round(confidence, 3),
+        "article_id": results[0]["article_id"],
+        "results": results,
     }
-    
-    for keyword, answer in faq_data.items():
-        if keyword in query.lower():
-            return {"answer": answer, "confidence": 0.9}
-    return {"answer": "No matching FAQ found", "confidence": 0.3}
 
 def get_customer_profile(customer_id):
-    """Get customer profile"""
-    df = pd.read_csv('data/customer_profiles.csv')
-    profile = df[df['customer_id'] == int(customer_id)].iloc[0].to_dict()
-    return profile
+    """Get customer profile; returns an empty dict for unknown customers."""
+    profile = get_profile_store().get(customer_id)
+    return dict(profile) if profile is not None else {}
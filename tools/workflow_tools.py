@@ -1,46 +1,268 @@
-import pandas as pd
-from config import DB_PATH
+import csv
+import json
+import os
+
+from config import EVENT_LOG_BACKUPS, EVENT_LOG_PATH, WORKFLOW_SLA_S, logger
+from tools.event_log import flush_event_log
+from tools.sketches import TDigest
 
 # tools/workflow_tools.py
 
-def analyze_logs():
-    """Return a stubbed log summary for the Workflow Audit demo."""
-    return {
-        "total_tickets": 1200,
-        "avg_resolution_hours": 18,
-        "sla_breach_rate": 0.07,
-        "top_queues": ["Billing", "Tech Support", "Onboarding"],
-        "notes": "Sample data for weekly audit demo, not from real systems.",
-    }
+WORKFLOWS_CSV_PATH = "data/workflows.csv"
+# Durations buffered per step before they are folded into its digest
+DIGEST_BATCH = 4096
+# Steps at or above this failure rate get a reliability automation
+FAILURE_RATE_ALERT = 0.2
+TOP_BOTTLENECKS = 3
 
 
-def suggest_automation(log_summary):
+def sla_for(step):
+    return WORKFLOW_SLA_S.get(step, WORKFLOW_SLA_S["default"])
+
+
+class StepStats:
+    """Bounded-memory running stats for one workflow step (durations in seconds)."""
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+        self.sla_s = sla_for(name)
+        self.volume = 0
+        self.failures = 0
+        self.breaches = 0
+        self.timed = 0
+        self.duration_total = 0.0
+        self.digest = TDigest()
+        self.suggested_fix = None
+        self._pending = []
+
+    def add(self, duration_s=None, failed=False, count=1):
+        """Record count runs of the step, each taking duration_s (None if unknown)."""
+        self.volume += count
+        if failed:
+            self.failures += count
+        if duration_s is None:
+            return
+        self.timed += count
+        self.duration_total += duration_s * count
+        if duration_s > self.sla_s:
+            self.breaches += count
+        if count == 1:
+            self._pending.append(duration_s)
+            if len(self._pending) >= DIGEST_BATCH:
+                self._fold()
+        else:
+            self.digest.update([duration_s], [count])
+
+    def _fold(self):
+        if self._pending:
+            self.digest.update(self._pending)
+            self._pending = []
+
+    def summary(self):
+        self._fold()
+        summary = {
+            "step": self.name,
+            "source": self.source,
+            "volume": self.volume,
+            "failures": self.failures,
+            "failure_rate": round(self.failures / self.volume, 4) if self.volume else 0.0,
+            "timed_runs": self.timed,
+            "sla_s": self.sla_s,
+            "sla_breaches": self.breaches,
+            "sla_breach_rate": round(self.breaches / self.timed, 4) if self.timed else None,
+            "mean_s": round(self.duration_total / self.timed, 3) if self.timed else None,
+        }
+        for q in (0.5, 0.95, 0.99):
+            value = self.digest.quantile(q)
+            summary[f"p{int(q * 100)}_s"] = round(value, 3) if value is not None else None
+        if self.suggested_fix:
+            summary["suggested_fix"] = self.suggested_fix
+        return summary
+
+
+def _log_files(log_path):
+    """Rotated event logs oldest first (path.N .. path.1), then the live file."""
+    backups = [f"{log_path}.{i}" for i in range(EVENT_LOG_BACKUPS, 0, -1)]
+    return [path for path in backups + [log_path] if os.path.exists(path)]
+
+
+def _scan_events(log_path, steps, queues, totals):
+    """Stream the JSONL event logs line by line into the step and queue stats."""
+    for path in _log_files(log_path):
+        totals["files"].append(path)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    event = None
+                if not isinstance(event, dict):
+                    # Malformed JSON, or valid JSON that is not an event object
+                    totals["bad_lines"] += 1
+                    continue
+                totals["events"] += 1
+
+                data = event.get("data")
+                data = data if isinstance(data, dict) else {}
+                name = event.get("step") or event.get("event", "unknown")
+                failed = event.get("event") == "failed" or "error" in data
+                duration_ms = event.get("duration_ms")
+                if not isinstance(duration_ms, (int, float)) or isinstance(duration_ms, bool):
+                    duration_ms = None
+                step = steps.get(name)
+                if step is None:
+                    step = steps[name] = StepStats(name, "agent_logs")
+                step.add(duration_ms / 1000 if duration_ms is not None else None, failed)
+
+                intent = data.get("intent")
+                if intent:
+                    queue = queues.setdefault(intent, {"volume": 0, "escalated": 0})
+                    queue["volume"] += 1
+                    if str(data.get("decision", "")).startswith("ESCALATE"):
+                        queue["escalated"] += 1
+                tier = data.get("decision_tier")
+                if tier:
+                    totals["decision_tiers"][tier] = totals["decision_tiers"].get(tier, 0) + 1
+
+
+def _scan_workflows(workflows_path, steps, totals):
+    """Fold pre-aggregated rows (avg_duration seconds, failure_rate, volume) into the steps."""
+    if not os.path.exists(workflows_path):
+        return
+    totals["files"].append(workflows_path)
+    with open(workflows_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                volume = int(float(row["volume"]))
+                duration = float(row["avg_duration"])
+                failure_rate = float(row["failure_rate"])
+            except (KeyError, TypeError, ValueError):
+                totals["bad_lines"] += 1
+                continue
+            name = row.get("step_name") or row.get("process_id") or "unknown"
+            step = steps.get(name)
+            if step is None:
+                step = steps[name] = StepStats(name, "workflows")
+            failures = round(volume * failure_rate)
+            step.add(duration, failed=True, count=failures)
+            step.add(duration, failed=False, count=volume - failures)
+            fix = (row.get("suggested_fix") or "").strip()
+            if fix and fix.lower() != "none":
+                step.suggested_fix = fix
+
+
+def analyze_logs(log_path=EVENT_LOG_PATH, workflows_path=WORKFLOWS_CSV_PATH):
     """
-    Return simple, fixed automation suggestions based on the log summary.
+    Summarize workflow performance from the agent event logs and workflows.csv.
 
-    This implementation does NOT use dicts as dictionary keys, so it avoids
-    the 'unhashable type: dict' error and is safe for the demo.
+    Both sources are streamed once; memory is bounded by the number of
+    distinct steps and intents, not by log size. Per step this reports
+    volume, failure rate, duration percentiles (t-digest), SLA breach rate
+    and a volume-weighted bottleneck score: total time spent in the step,
+    inflated by its failure rate, relative to the worst step. Events still
+    buffered in this process's event log are written out first.
     """
-    return {
-        "summary": "Weekly audit completed for sample enterprise workflows.",
-        "bottlenecks": [
-            {
-                "name": "Manual ticket triage",
-                "impact": "Adds 4–6 hours delay for about 35% of new tickets.",
-            },
-            {
-                "name": "Billing escalation queue",
-                "impact": "High-priority payment issues wait more than 8 hours.",
-            },
-        ],
-        "automations": [
-            {
-                "name": "Auto-route payment issues",
-                "description": "Detect 'payment' intent and route directly to Billing L2.",
-            },
-            {
-                "name": "Auto-close resolved FAQs",
-                "description": "Automatically close tickets when customers confirm the FAQ answer helped.",
-            },
-        ],
+    flush_event_log(log_path)
+    steps, queues = {}, {}
+    totals = {"files": [], "events": 0, "bad_lines": 0, "decision_tiers": {}}
+    _scan_events(log_path, steps, queues, totals)
+    _scan_workflows(workflows_path, steps, totals)
+
+    summaries = [step.summary() for step in steps.values()]
+    for summary in summaries:
+        spent = (summary["mean_s"] or 0) * summary["volume"]
+        summary["bottleneck_score"] = spent * (1 + summary["failure_rate"])
+    worst = max((s["bottleneck_score"] for s in summaries), default=0)
+    for summary in summaries:
+        summary["bottleneck_score"] = round(summary["bottleneck_score"] / worst, 4) if worst else 0.0
+    summaries.sort(key=lambda s: s["bottleneck_score"], reverse=True)
+
+    volume = sum(s["volume"] for s in summaries)
+    timed_volume = sum(s["timed_runs"] for s in summaries)
+    tickets = sum(q["volume"] for q in queues.values())
+    escalated = sum(q["escalated"] for q in queues.values())
+    result = {
+        "total_runs": volume,
+        "total_tickets": tickets,
+        "failure_rate": round(sum(s["failures"] for s in summaries) / volume, 4) if volume else 0.0,
+        "sla_breach_rate": (
+            round(sum(s["sla_breaches"] for s in summaries) / timed_volume, 4) if timed_volume else None
+        ),
+        "escalation_rate": round(escalated / tickets, 4) if tickets else None,
+        "top_queues": sorted(queues, key=lambda q: queues[q]["volume"], reverse=True)[:3],
+        "queues": queues,
+        "decision_tiers": totals["decision_tiers"],
+        "steps": summaries,
+        "sources": {
+            "files": totals["files"],
+            "events": totals["events"],
+            "bad_lines": totals["bad_lines"],
+        },
     }
+    logger.info("Workflow logs analyzed", extra=result["sources"])
+    return result
+
+
+def suggest_automation(log_summary):
+    """Derive bottlenecks and automation suggestions from an analyze_logs() summary."""
+    steps = log_summary.get("steps", [])
+
+    bottlenecks = []
+    for step in steps[:TOP_BOTTLENECKS]:
+        if not step["bottleneck_score"]:
+            continue
+        impact = f"{step['volume']} runs, median {step['p50_s']}s, p95 {step['p95_s']}s"
+        impact += f", {step['failure_rate']:.0%} failing"
+        if step["sla_breach_rate"]:
+            impact += f", {step['sla_breach_rate']:.0%} over the {step['sla_s']:g}s target"
+        bottlenecks.append({"name": step["step"], "impact": impact + "."})
+
+    automations = []
+    for step in steps:
+        if step["failure_rate"] >= FAILURE_RATE_ALERT:
+            automations.append(
+                {
+                    "name": f"Stabilize {step['step']}",
+                    "description": (
+                        f"{step.get('suggested_fix') or 'Add automatic retries with backoff'} "
+                        f"to cut the {step['failure_rate']:.0%} failure rate "
+                        f"({step['failures']} failed runs)."
+                    ),
+                }
+            )
+    for intent, queue in log_summary.get("queues", {}).items():
+        if queue["volume"] and queue["escalated"] / queue["volume"] >= 0.5:
+            automations.append(
+                {
+                    "name": f"Auto-route {intent} tickets",
+                    "description": (
+                        f"{queue['escalated']} of {queue['volume']} {intent} tickets are escalated; "
+                        "route them straight to the owning team."
+                    ),
+                }
+            )
+    tiers = log_summary.get("decision_tiers", {})
+    decided = sum(tiers.values())
+    llm_decided = tiers.get("llm", 0) + tiers.get("llm_fallback", 0)
+    if decided and llm_decided / decided >= 0.5:
+        automations.append(
+            {
+                "name": "Extend intent rules",
+                "description": (
+                    f"{llm_decided} of {decided} ticket decisions needed the LLM; "
+                    "add keyword rules for the most common intents."
+                ),
+            }
+        )
+
+    if steps:
+        summary = (
+            f"Audited {log_summary['total_runs']} runs across {len(steps)} workflow steps; "
+            f"top bottleneck is {steps[0]['step']}."
+        )
+        if log_summary.get("sla_breach_rate") is not None:
+            summary += f" {log_summary['sla_breach_rate']:.0%} of timed runs missed their SLA."
+    else:
+        summary = "No workflow logs found to audit."
+    return {"summary": summary, "bottlenecks": bottlenecks, "automations": automations}